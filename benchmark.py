@@ -0,0 +1,222 @@
+"""Ingest benchmarks for the Elastic Agent log analyzer.
+
+Generates synthetic Elastic Agent log lines, times the ingest paths the
+analyzer's optimizations rely on and measures per-record memory. Run from
+the repository root:
+
+    python benchmark.py > bench_output.txt
+    python benchmark.py --lines 500000 --workers 8 parallel
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import pickle
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import elastic_agent_log_analyzer as analyzer
+
+COMPONENTS = ['filebeat', 'metricbeat', 'elastic-agent', 'endpoint-security']
+LEVELS = ['info', 'info', 'info', 'debug', 'warn', 'error']
+MESSAGES = [
+    'Connection to backoff(elasticsearch(https://es-{n}.example.com:9200)) established',
+    'Failed to connect to backoff(elasticsearch(https://es-{n}.example.com:9200)): connection refused',
+    'Non-zero metrics in the last 30s',
+    'Harvester started for paths: [/var/log/app-{n}.log]',
+    'error while reading from source: timeout after {n}ms',
+]
+
+
+def write_sample(path, lines, seed=0):
+    """Write lines of synthetic agent logs, one JSON document per line"""
+    rng = random.Random(seed)
+    time_ = datetime(2024, 1, 15, tzinfo=timezone.utc)
+    with open(path, 'w', encoding='utf-8') as f:
+        for _ in range(lines):
+            time_ += timedelta(milliseconds=rng.randrange(2000))
+            component = rng.choice(COMPONENTS)
+            entry = {
+                '@timestamp': time_.strftime('%Y-%m-%dT%H:%M:%S.') + f'{time_.microsecond // 1000:03d}Z',
+                'log.level': rng.choice(LEVELS),
+                'message': rng.choice(MESSAGES).format(n=rng.randrange(1000)),
+                'component': {'binary': component, 'type': 'beat'},
+                'log.origin': {'function': 'run', 'file.name': 'input.go', 'file.line': rng.randrange(500)},
+            }
+            f.write(json.dumps(entry) + '\n')
+
+
+def best_of(func, repeat=3):
+    """Return the fastest of repeat timed calls of func, in seconds"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def read_entries(path):
+    """Return the decoded JSON documents of path, one per line"""
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def dict_record(entry, line_num, file_name, server_name):
+    """Build the per-entry dict that LogRecord replaced"""
+    processed = {'raw': entry, 'line_number': line_num, 'file_name': file_name, 'server_name': server_name}
+    parsed = datetime.fromisoformat(entry['@timestamp'].replace('Z', '+00:00'))
+    processed['parsed_timestamp'] = parsed
+    processed['timestamp'] = (parsed + timedelta(hours=0)).strftime('%Y-%m-%d %H:%M:%S UTC')
+    processed['level'] = entry.get('log.level', 'unknown')
+    processed['component'] = entry['component'].get('binary', 'unknown')
+    message = entry.get('message', '')
+    processed['message'] = message[:100] + '...' if len(message) > 100 else message
+    processed['full_message'] = message
+    return processed
+
+
+def traced_bytes(func):
+    """Return the memory still allocated by func's result, in bytes"""
+    tracemalloc.start()
+    try:
+        result = func()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+def parse_parallel(pool, path, workers):
+    """Parse path the way the loader does with worker processes"""
+    ranges = analyzer.split_file_ranges(path, workers)
+    futures = [pool.submit(analyzer.parse_file_columns, path, start, end, 'bench', 'Bench')
+               for start, end in ranges]
+    results = ((analyzer.records_from_columns(columns, path, 'bench', 'Bench'), *rest)
+               for columns, *rest in (future.result() for future in futures))
+    return [entry for entries, _ in analyzer.renumber_range_results(results) for entry in entries]
+
+
+def bench_parallel(path, args):
+    """Parsing one file in one process and in worker processes"""
+    size = os.path.getsize(path)
+    single = best_of(lambda: analyzer.parse_file_range(path, 0, size, 'bench', 'Bench'))
+    # Rebuilding records from the workers' columns is the part that stays in the loader
+    columns = pickle.dumps(analyzer.parse_file_columns(path, 0, size, 'bench', 'Bench'))
+    rebuild = best_of(lambda: analyzer.records_from_columns(pickle.loads(columns)[0], path, 'bench', 'Bench'))
+    print(f"parse in one process:            {single:.3f}s")
+    print(f"records rebuilt in loader:       {rebuild:.3f}s (speedup ceiling {single / rebuild:.1f}x)")
+    with ProcessPoolExecutor(max_workers=args.workers,
+                             mp_context=multiprocessing.get_context('spawn')) as pool:
+        parse_parallel(pool, path, args.workers)  # start the workers
+        parallel = best_of(lambda: parse_parallel(pool, path, args.workers))
+    print(f"parse with worker processes:     {parallel:.3f}s "
+          f"({single / parallel:.2f}x with {args.workers} workers on {os.cpu_count()} CPUs)")
+    analyzer.RAW_ENTRIES.clear()
+
+
+def bench_timestamps(path, args):
+    """Parsing @timestamp values, per line"""
+    texts = [entry['@timestamp'] for entry in read_entries(path)]
+
+    def formatted():
+        # Parsed to a datetime and formatted for display up front, as records once were
+        for text in texts:
+            (datetime.fromisoformat(text.replace('Z', '+00:00')) + timedelta(hours=0)).strftime(
+                '%Y-%m-%d %H:%M:%S UTC')
+
+    def full_parse():
+        for text in texts:
+            analyzer.datetime_to_ns(datetime.fromisoformat(text.replace('Z', '+00:00')))
+
+    def fast_parse():
+        for text in texts:
+            analyzer.parse_timestamp_ns(text)
+
+    for label, func in (('fromisoformat + strftime', formatted),
+                        ('fromisoformat + datetime_to_ns', full_parse),
+                        ('parse_timestamp_ns', fast_parse)):
+        print(f"{label + ':':<33}{best_of(func) / len(texts) * 1e9:5.0f} ns")
+
+
+def bench_json(path, args):
+    """Decoding log lines with json and with the selected decoder"""
+    with open(path, encoding='utf-8') as f:
+        lines = [line.strip() for line in f]
+    size = os.path.getsize(path)
+    selected = analyzer._fast_json_loads
+
+    def parse_file():
+        analyzer.parse_file_range(path, 0, size, 'bench', 'Bench')
+        analyzer.RAW_ENTRIES.clear()
+
+    decoded = (best_of(lambda: list(map(json.loads, lines))),
+               best_of(lambda: list(map(analyzer.decode_json, lines))))
+    # With json.loads as the selected decoder, decode_json uses the stdlib alone
+    try:
+        analyzer._fast_json_loads = json.loads
+        stdlib = best_of(parse_file)
+    finally:
+        analyzer._fast_json_loads = selected
+    parsed = stdlib, best_of(parse_file)
+    for label, (with_json, with_selected) in (('decode lines', decoded), ('parse_file_range', parsed)):
+        print(f"{label + ' with json:':<33}{with_json:.3f}s")
+        print(f"{label + ' with ' + analyzer.JSON_DECODER + ':':<33}{with_selected:.3f}s "
+              f"({with_json / with_selected:.2f}x)")
+
+
+def bench_records(path, args):
+    """Memory per record, not counting the raw JSON both layouts keep"""
+    entries = read_entries(path)
+
+    def build(make_record):
+        return [make_record(entry, line_num, 'bench', 'Bench') for line_num, entry in enumerate(entries, 1)]
+
+    dicts = traced_bytes(lambda: build(dict_record))
+    records = traced_bytes(lambda: build(analyzer.process_log_entry))
+    print(f"dict per entry:                  {dicts / len(entries):.0f} bytes")
+    print(f"LogRecord:                       {records / len(entries):.0f} bytes "
+          f"({1 - records / dicts:.0%} less)")
+
+
+SECTIONS = {
+    'parallel': bench_parallel,
+    'timestamps': bench_timestamps,
+    'json': bench_json,
+    'records': bench_records,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('sections', nargs='*', help=f"sections to run: {', '.join(SECTIONS)} (default: all)")
+    parser.add_argument('--lines', type=int, default=100000, help="synthetic log lines (default 100000)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="worker processes for the parallel section (default: CPU count)")
+    args = parser.parse_args()
+    unknown = set(args.sections) - set(SECTIONS)
+    if unknown:
+        parser.error(f"unknown sections: {', '.join(sorted(unknown))}")
+
+    fd, path = tempfile.mkstemp(suffix='.ndjson')
+    os.close(fd)
+    try:
+        write_sample(path, args.lines)
+        print(f"Python {sys.version.split()[0]}, {args.lines} lines "
+              f"({os.path.getsize(path) / 1e6:.1f} MB), JSON decoder {analyzer.JSON_DECODER}")
+        for name in args.sections or SECTIONS:
+            print(f"\n[{name}] {SECTIONS[name].__doc__}")
+            SECTIONS[name](path, args)
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
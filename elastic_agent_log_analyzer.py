@@ -5,15 +5,914 @@ Elastic Agent logs across multiple servers
 """
 
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, scrolledtext
+from tkinter import ttk, filedialog, messagebox, scrolledtext, simpledialog
 import json
+import importlib
 import re
+import sys
 from datetime import datetime, timezone, timedelta
-from collections import defaultdict, Counter
+from collections import defaultdict, Counter, OrderedDict
 import threading
+import queue
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import chain, islice, compress
+from operator import itemgetter, le
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import statistics
 import difflib
+import random
+
+# Buffer size used when streaming log files from disk
+READ_BUFFER_SIZE = 1024 * 1024
+
+# Files at least this large are parsed in parallel when more than one worker is configured
+PARALLEL_PARSE_MIN_BYTES = 64 * 1024 * 1024
+# Target size of each byte range handed to a parse worker
+PARALLEL_CHUNK_BYTES = 16 * 1024 * 1024
+DEFAULT_PARSE_WORKERS = os.cpu_count() or 1
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+# Timestamp column value for logs without a usable timestamp; sorts before any real time
+NO_TIMESTAMP = -2**63
+# Range of times the int64 nanosecond timestamp column can hold (about 1677 to 2262)
+MIN_TIMESTAMP_NS = NO_TIMESTAMP + 1
+MAX_TIMESTAMP_NS = 2**63 - 1
+
+# Number of re-read raw JSON entries kept when raw entries are not retained in memory
+RAW_CACHE_SIZE = 10000
+# Number of formatted display timestamps kept for the selected timezone
+TIMESTAMP_CACHE_SIZE = 4096
+
+# Log table geometry used until the first row can be measured
+DEFAULT_ROW_HEIGHT = 20
+DEFAULT_HEADER_HEIGHT = 25
+# Rows moved per mouse wheel step in the log table
+WHEEL_SCROLL_ROWS = 3
+
+# Search tokens: runs of word characters in the lowercased search text
+TOKEN_RE = re.compile(r'\w+')
+# Characters that end the literal prefix of a search regex
+REGEX_SPECIAL = frozenset('.^$*+?{}[]\\|()')
+
+# Records search-checked by the filter thread between result updates
+FILTER_CHUNK_SIZE = 5000
+# Delay after the last keystroke in the search box before filters are re-applied
+FILTER_DEBOUNCE_MS = 300
+# Number of recent filter results kept per server viewer
+FILTER_CACHE_SIZE = 16
+# Distinct messages whose difflib matcher is kept during a similarity search
+SIMILARITY_MATCHER_CACHE_SIZE = 1024
+# Message pairs whose similarity score is kept between comparison runs
+SIMILARITY_SCORE_CACHE_SIZE = 250000
+
+# Message template mining: leading tokens routed through the parse tree, share of
+# tokens a message must have in common with a template to join it, and children
+# a tree node may have before further tokens are routed to the wildcard child
+TEMPLATE_TREE_DEPTH = 2
+TEMPLATE_SIMILARITY = 0.5
+TEMPLATE_MAX_CHILDREN = 100
+# Number of distinct messages whose template id is remembered
+TEMPLATE_CACHE_SIZE = 100000
+TEMPLATE_WILDCARD = '<*>'
+# Tokens containing a digit are treated as parameters
+TEMPLATE_PARAM_RE = re.compile(r'\d')
+
+# Fleet similarity: MinHash signatures over character shingles, split into LSH
+# bands; messages whose signatures agree on every row of a band are paired
+MINHASH_SHINGLE_SIZE = 4
+MINHASH_BANDS = 32
+MINHASH_ROWS = 3
+# Number of distinct messages whose signature is kept between runs (about 0.8 KB each)
+MINHASH_CACHE_SIZE = 50000
+# Digit runs are replaced by a single 0 when messages are normalized
+NUMBER_RE = re.compile(r'\d+')
+
+# Query bar syntax: field:value, @timestamp comparisons, quoted phrases and bare words
+QUERY_TERM_RE = re.compile(
+    r'(?P<field>[@\w.]+)(?P<op>>=|<=|>|<|:)(?P<value>"[^"]*"|[^\s"]+)'
+    r'|"(?P<phrase>[^"]*)"|(?P<word>\S+)')
+QUERY_FIELDS = {
+    'level': 'level', 'log.level': 'level',
+    'component': 'component',
+    'file': 'file_name', 'file_name': 'file_name',
+    'message': 'message', 'msg': 'message',
+    '@timestamp': 'timestamp', 'timestamp': 'timestamp',
+}
+
+# Number of files loaded concurrently by the load queue
+LOAD_QUEUE_WORKERS = 4
+# File patterns picked up when loading a directory
+LOG_FILE_PATTERNS = ('*.ndjson', '*.log', '*.json')
+
+TIMEZONE_OFFSETS = {
+    "UTC": 0,
+    "Eastern (EDT)": -4,  # UTC-4
+    "Eastern (EST)": -5,  # UTC-5
+    "Central (CDT)": -5,  # UTC-5
+    "Central (CST)": -6,  # UTC-6
+    "Mountain (MDT)": -6, # UTC-6
+    "Mountain (MST)": -7, # UTC-7
+    "Pacific (PDT)": -7,  # UTC-7
+    "Pacific (PST)": -8   # UTC-8
+}
+
+TIMEZONE_NAMES = {
+    "UTC": "UTC",
+    "Eastern (EDT)": "EDT", 
+    "Eastern (EST)": "EST",
+    "Central (CDT)": "CDT",
+    "Central (CST)": "CST", 
+    "Mountain (MDT)": "MDT",
+    "Mountain (MST)": "MST",
+    "Pacific (PDT)": "PDT",
+    "Pacific (PST)": "PST"
+}
+
+# Optional faster JSON decoders, tried in order; the stdlib json module is the fallback
+JSON_DECODER_MODULES = ('orjson', 'simdjson', 'ujson')
+
+def select_json_decoder():
+    """Return (name, loads) for the first installed module in JSON_DECODER_MODULES"""
+    for name in JSON_DECODER_MODULES:
+        try:
+            module = importlib.import_module(name)
+        except ImportError:
+            continue
+        return name, module.loads
+    return 'json', json.loads
+
+JSON_DECODER, _fast_json_loads = select_json_decoder()
+
+# Digits mapped to '0', so a run long enough to overflow a 64-bit integer
+# (19 digits for negative values) is found with one substring search
+_DIGITS_TO_ZERO = bytes.maketrans(b'123456789', b'000000000')
+_LONG_DIGIT_RUN = b'0' * 19
+
+def decode_json(text):
+    """Decode a JSON document with the selected decoder.
+    
+    Input the accelerated decoder rejects is decoded again with json.loads,
+    so malformed lines raise the same json.JSONDecodeError as before and
+    input only the stdlib accepts (NaN, Infinity) still loads. orjson reads
+    integers wider than 64 bits as floats without raising, so lines with a
+    run of 19 or more digits always use json.loads and keep exact values.
+    """
+    if _fast_json_loads is not json.loads and (
+            _LONG_DIGIT_RUN not in text.encode('utf-8').translate(_DIGITS_TO_ZERO)):
+        try:
+            return _fast_json_loads(text)
+        except Exception:
+            pass
+    return json.loads(text)
+
+class LRUCache:
+    """Small thread-safe mapping that evicts the least recently used entries"""
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+        
+    def get(self, key, default=None):
+        with self.lock:
+            try:
+                self.data.move_to_end(key)
+            except KeyError:
+                return default
+            return self.data[key]
+            
+    def put(self, key, value):
+        with self.lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+                
+    def items(self):
+        """Return a snapshot of the cached (key, value) pairs"""
+        with self.lock:
+            return list(self.data.items())
+            
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+class RawEntryStore:
+    """Re-reads raw JSON entries from their source files by byte offset.
+    
+    Used for records whose parsed entry was not retained at load time.
+    Recently read entries are kept in an LRU cache.
+    """
+    def __init__(self, cache_size=RAW_CACHE_SIZE):
+        self.cache = LRUCache(cache_size)
+        self.lock = threading.Lock()
+        self.handles = {}
+        
+    def load(self, path, offset, length):
+        key = (path, offset)
+        entry = self.cache.get(key)
+        if entry is None:
+            with self.lock:
+                f = self.handles.get(path)
+                if f is None:
+                    f = self.handles[path] = open(path, 'rb')
+                f.seek(offset)
+                data = f.read(length)
+            entry = decode_json(data.decode('utf-8'))
+            self.cache.put(key, entry)
+        return entry
+        
+    def clear(self):
+        """Drop cached entries and close source files"""
+        self.cache.clear()
+        with self.lock:
+            for f in self.handles.values():
+                f.close()
+            self.handles = {}
+
+RAW_ENTRIES = RawEntryStore()
+
+class TemplateMiner:
+    """Groups log messages into templates with a Drain-style parse tree.
+    
+    Messages are split on whitespace. A message is routed by its token count
+    and its first TEMPLATE_TREE_DEPTH tokens to a short list of templates,
+    and joins the one it shares the most tokens with if that is at least
+    TEMPLATE_SIMILARITY of them; positions that differ become wildcards.
+    Otherwise it starts a new template. Template ids are shared by all
+    servers, so equal ids mean the same template wherever they appear.
+    """
+    def __init__(self):
+        self.ids = LRUCache(TEMPLATE_CACHE_SIZE)
+        self.lock = threading.Lock()
+        self.clear()
+        
+    def clear(self):
+        """Forget every template; only safe once no loaded log keeps a template id"""
+        with self.lock:
+            # Template id -> token list; replaced as a whole when a template is generalized
+            self.templates = []
+            # Tree path -> tokens routed from it, and leaf path -> template ids
+            self.children = {}
+            self.leaves = {}
+            self.ids.clear()
+            
+    def assign(self, logs):
+        """Set template_id on each log, mining new templates as needed"""
+        with self.lock:
+            for log in logs:
+                message = log.full_message
+                if not isinstance(message, str):
+                    message = str(message)
+                template_id = self.ids.get(message)
+                if template_id is None:
+                    template_id = self._mine(message)
+                    self.ids.put(message, template_id)
+                log.template_id = template_id
+                
+    def _mine(self, message):
+        tokens = [TEMPLATE_WILDCARD if TEMPLATE_PARAM_RE.search(token) else token
+                  for token in message.split()]
+        path = (len(tokens),)
+        for token in tokens[:TEMPLATE_TREE_DEPTH]:
+            routed = self.children.setdefault(path, set())
+            if token not in routed:
+                if len(routed) >= TEMPLATE_MAX_CHILDREN:
+                    token = TEMPLATE_WILDCARD
+                routed.add(token)
+            path += (token,)
+        leaf = self.leaves.setdefault(path, [])
+        
+        # Most shared tokens wins (wildcards match anything), then the more specific template
+        best_id, best_key = None, None
+        for template_id in leaf:
+            template = self.templates[template_id]
+            same = wildcards = 0
+            for template_token, token in zip(template, tokens):
+                if template_token == token:
+                    same += 1
+                elif template_token == TEMPLATE_WILDCARD:
+                    wildcards += 1
+            key = (same + wildcards, -wildcards)
+            if best_key is None or key > best_key:
+                best_id, best_key = template_id, key
+                
+        if best_id is not None and best_key[0] >= TEMPLATE_SIMILARITY * len(tokens):
+            template = self.templates[best_id]
+            merged = [t if t == token else TEMPLATE_WILDCARD for t, token in zip(template, tokens)]
+            if merged != template:
+                self.templates[best_id] = merged
+            return best_id
+            
+        template_id = len(self.templates)
+        self.templates.append(tokens)
+        leaf.append(template_id)
+        return template_id
+        
+    def template(self, template_id):
+        """Return the text of a template, with wildcards for its parameters"""
+        return ' '.join(self.templates[template_id])
+        
+    def parameters(self, template_id, message):
+        """Return the values in message at its template's wildcard positions"""
+        template = self.templates[template_id]
+        return [token for t, token in zip(template, str(message).split()) if t == TEMPLATE_WILDCARD]
+        
+    def __len__(self):
+        return len(self.templates)
+
+LOG_TEMPLATES = TemplateMiner()
+
+class TimestampFormatter:
+    """Formats timestamps for display in the selected timezone.
+    
+    Records only keep the parsed instant; display strings are produced on
+    demand for the rows being shown and memoized until the timezone changes.
+    """
+    def __init__(self, cache_size=TIMESTAMP_CACHE_SIZE):
+        self.offset = timedelta(0)
+        self.name = "UTC"
+        self.cache = LRUCache(cache_size)
+        
+    def set_timezone(self, offset_hours, name):
+        self.offset = timedelta(hours=offset_hours)
+        self.name = name
+        self.cache.clear()
+        
+    def format(self, ns):
+        """Format epoch nanoseconds; the display has whole seconds, so they key the cache"""
+        seconds = ns // 1_000_000_000
+        text = self.cache.get(seconds)
+        if text is None:
+            local = EPOCH + timedelta(seconds=seconds) + self.offset
+            text = local.strftime(f'%Y-%m-%d %H:%M:%S {self.name}')
+            self.cache.put(seconds, text)
+        return text
+
+DISPLAY_TIMESTAMPS = TimestampFormatter()
+
+class LogRecord:
+    """A normalized log entry.
+    
+    Slotted rather than a dict to keep per-record memory small; the truncated
+    table message is derived from full_message on demand. The parsed raw entry
+    may be released after loading, in which case it is re-read from the source
+    file on access.
+    """
+    __slots__ = ('_raw', 'line_number', 'file_name', 'server_name', 'timestamp_ns',
+                 'timestamp_text', 'level', 'component', 'full_message', 'has_metrics',
+                 'source', 'offset', 'length', 'template_id')
+    
+    def __init__(self, raw, line_number, file_name, server_name, timestamp_ns,
+                 timestamp_text, level, component, full_message, has_metrics=False,
+                 source=None, offset=None, length=None, template_id=None):
+        self._raw = raw
+        self.line_number = line_number
+        self.file_name = file_name
+        self.server_name = server_name
+        # UTC epoch nanoseconds, NO_TIMESTAMP when the entry had no usable timestamp
+        self.timestamp_ns = timestamp_ns
+        # Shown instead of a formatted time when the entry had no usable timestamp
+        self.timestamp_text = timestamp_text
+        self.level = level
+        self.component = component
+        self.full_message = full_message
+        # Whether the raw entry carries monitoring data, so health analysis can skip the rest
+        self.has_metrics = has_metrics
+        self.source = source
+        self.offset = offset
+        self.length = length
+        # Message template id in LOG_TEMPLATES, assigned when the log joins a server group
+        self.template_id = template_id
+        
+    @property
+    def raw(self):
+        raw = self._raw
+        if raw is None:
+            raw = RAW_ENTRIES.load(self.source, self.offset, self.length)
+        return raw
+        
+    def release_raw(self, source, offset, length):
+        """Drop the parsed raw entry, remembering where in source to re-read it from"""
+        self._raw = None
+        self.source = source
+        self.offset = offset
+        self.length = length
+        
+    @property
+    def parsed_timestamp(self):
+        """Timestamp as a UTC datetime (datetime.min when there is none)"""
+        return ns_to_datetime(self.timestamp_ns)
+        
+    @property
+    def timestamp(self):
+        """Timestamp for display in the selected timezone"""
+        if self.timestamp_text is not None:
+            return self.timestamp_text
+        return DISPLAY_TIMESTAMPS.format(self.timestamp_ns)
+        
+    @property
+    def message(self):
+        """Message truncated for display in the log table"""
+        message = self.full_message
+        return message[:100] + '...' if len(message) > 100 else message
+        
+    @property
+    def template(self):
+        """Text of the message template this log belongs to"""
+        return LOG_TEMPLATES.template(self.template_id)
+        
+    @property
+    def parameters(self):
+        """Values of the message at its template's wildcard positions"""
+        return LOG_TEMPLATES.parameters(self.template_id, self.full_message)
+
+# Minute prefix ('YYYY-MM-DDTHH:MM') of the last fast-parsed timestamp and its epoch ns.
+# Replaced as a whole tuple so concurrent loader threads never see a mixed pair.
+_timestamp_minute = ('\0', 0)
+
+def parse_timestamp_ns(text):
+    """Parse an @timestamp string to UTC epoch nanoseconds.
+    
+    Elastic Agent's 'YYYY-MM-DDTHH:MM:SS.fffZ' layout is decoded directly,
+    reusing the date, hour and minute computed for the previous line; other
+    layouts go through datetime.fromisoformat. Raises ValueError if the text
+    is not a timestamp.
+    """
+    global _timestamp_minute
+    if len(text) == 24 and text[19] == '.' and text[23] == 'Z' and text[16] == ':':
+        millis = text[17:19] + text[20:23]
+        if millis.isdigit() and millis.isascii() and millis < '60000':
+            prefix, minute_ns = _timestamp_minute
+            if not text.startswith(prefix):
+                prefix = text[:16]
+                digits = prefix[:4] + prefix[5:7] + prefix[8:10] + prefix[11:13] + prefix[14:]
+                if not (prefix[4] == '-' and prefix[7] == '-' and prefix[10] == 'T' and prefix[13] == ':'
+                        and digits.isdigit() and digits.isascii()):
+                    return datetime_to_ns(datetime.fromisoformat(text.replace('Z', '+00:00')))
+                minute = datetime(int(prefix[:4]), int(prefix[5:7]), int(prefix[8:10]),
+                                  int(prefix[11:13]), int(prefix[14:]), tzinfo=timezone.utc)
+                minute_ns = datetime_to_ns(minute)
+                if minute_ns == NO_TIMESTAMP:
+                    # The minute starts outside the column's range; the full parse decides
+                    return datetime_to_ns(datetime.fromisoformat(text.replace('Z', '+00:00')))
+                _timestamp_minute = (prefix, minute_ns)
+            ns = minute_ns + int(millis) * 1_000_000
+            return ns if ns <= MAX_TIMESTAMP_NS else NO_TIMESTAMP
+    return datetime_to_ns(datetime.fromisoformat(text.replace('Z', '+00:00')))
+
+def process_log_entry(entry, line_num, file_name, server_name):
+    """Process and normalize a log entry into a LogRecord"""
+    # Extract timestamp; the display string is formatted lazily in the selected timezone
+    timestamp_str = entry.get('@timestamp', '')
+    if timestamp_str:
+        try:
+            timestamp_ns = parse_timestamp_ns(timestamp_str)
+            # Out of the column's range: shown as written, like an unparseable time
+            timestamp = timestamp_str if timestamp_ns == NO_TIMESTAMP else None
+        except:
+            timestamp = timestamp_str
+            timestamp_ns = NO_TIMESTAMP
+    else:
+        timestamp = 'N/A'
+        timestamp_ns = NO_TIMESTAMP
+        
+    # Extract log level
+    log_level = entry.get('log.level', 'unknown')
+    
+    # Extract component
+    component = 'unknown'
+    if 'component' in entry:
+        comp_info = entry['component']
+        if isinstance(comp_info, dict):
+            component = comp_info.get('binary', comp_info.get('type', 'unknown'))
+        else:
+            component = str(comp_info)
+    elif 'service.name' in entry:
+        component = entry['service.name']
+        
+    # Level and component repeat on every line; share one string object for each value
+    if isinstance(log_level, str):
+        log_level = sys.intern(log_level)
+    if isinstance(component, str):
+        component = sys.intern(component)
+    
+    # Extract message
+    message = entry.get('message', '')
+    
+    return LogRecord(entry, line_num, file_name, server_name, timestamp_ns, timestamp,
+                     log_level, component, message, 'monitoring' in entry)
+
+def split_file_ranges(file_path, parts):
+    """Split a file into byte ranges that start and end on line boundaries"""
+    size = os.path.getsize(file_path)
+    if parts <= 1 or size == 0:
+        return [(0, size)]
+        
+    bounds = [0]
+    with open(file_path, 'rb') as f:
+        for i in range(1, parts):
+            target = size * i // parts
+            if target <= bounds[-1]:
+                continue
+            f.seek(target)
+            f.readline()  # Move to the start of the next line
+            pos = f.tell()
+            if pos >= size:
+                break
+            bounds.append(pos)
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+def parse_file_range(file_path, start, end, file_name, server_name, keep_raw=True):
+    """Parse the log lines in a byte range of a file.
+    
+    Runs in worker processes, so it only returns plain data. Line numbers are
+    relative to the start of the range; see renumber_range_results. With
+    keep_raw False, records keep only the byte offset and length of their line.
+    Returns (entries, errors, line_count, leading_blank_lines).
+    """
+    entries = []
+    errors = []
+    line_num = 0
+    leading_blank = 0
+    
+    with open(file_path, 'rb', buffering=READ_BUFFER_SIZE) as f:
+        f.seek(start)
+        pos = start
+        while pos < end:
+            raw_line = f.readline()
+            if not raw_line:
+                break
+            line_offset = pos
+            pos += len(raw_line)
+            line_num += 1
+            
+            line = raw_line.decode('utf-8').strip()
+            if not line:
+                if leading_blank == line_num - 1:
+                    leading_blank += 1
+                continue
+                
+            try:
+                log_entry = decode_json(line)
+                processed_entry = process_log_entry(log_entry, line_num, file_name, server_name)
+                if processed_entry:
+                    if not keep_raw:
+                        processed_entry.release_raw(file_path, line_offset, len(raw_line))
+                    entries.append(processed_entry)
+            except json.JSONDecodeError as e:
+                errors.append((line_num, str(e)))
+                continue
+                
+    return entries, errors, line_num, leading_blank
+
+def parse_file_columns(file_path, start, end, file_name, server_name):
+    """Parse a byte range like parse_file_range, returning the records as columns.
+    
+    Used by worker processes. Unpickling whole records, raw entries included,
+    cost the loading process about as much as parsing the range itself, so
+    only the fields records are rebuilt from travel back, with each line's
+    offset and length for re-reading the raw entry; see records_from_columns.
+    Returns (columns, errors, line_count, leading_blank_lines).
+    """
+    entries, errors, line_count, leading_blank = parse_file_range(
+        file_path, start, end, file_name, server_name, keep_raw=False)
+    columns = (
+        array('I', [entry.line_number for entry in entries]),
+        array('q', [entry.timestamp_ns for entry in entries]),
+        [entry.timestamp_text for entry in entries],
+        [entry.level for entry in entries],
+        [entry.component for entry in entries],
+        [entry.full_message for entry in entries],
+        array('B', [entry.has_metrics for entry in entries]),
+        array('Q', [entry.offset for entry in entries]),
+        array('I', [entry.length for entry in entries]),
+    )
+    return columns, errors, line_count, leading_blank
+
+def records_from_columns(columns, file_path, file_name, server_name):
+    """Rebuild the records of a parse_file_columns result; their raw entries stay on disk"""
+    line_numbers, timestamps, timestamp_texts, levels, components, messages, metrics, offsets, lengths = columns
+    # Unpickling loses the interning done by process_log_entry
+    levels = [sys.intern(level) if isinstance(level, str) else level for level in levels]
+    components = [sys.intern(component) if isinstance(component, str) else component
+                  for component in components]
+    return [LogRecord(None, line_number, file_name, server_name, timestamp_ns, timestamp_text,
+                      level, component, message, bool(has_metrics), file_path, offset, length)
+            for line_number, timestamp_ns, timestamp_text, level, component, message, has_metrics,
+                offset, length in zip(line_numbers, timestamps, timestamp_texts, levels, components,
+                                      messages, metrics, offsets, lengths)]
+
+def searchable_text(message, raw):
+    """Return the lowercased text the log search matches against"""
+    return f"{message} {json.dumps(raw)}".lower()
+
+def record_search_text(log):
+    """Return a record's search text; only its message while its source file is unavailable"""
+    try:
+        raw = log.raw
+    except (OSError, ValueError):
+        return f"{log.full_message}".lower()
+    return searchable_text(log.full_message, raw)
+
+def parse_filter_time(text, tz_offset=timedelta(0)):
+    """Parse a filter time given in ISO 8601 or 'YYYY-MM-DD HH:MM:SS' form; None if invalid.
+    
+    Times without a UTC offset are read at tz_offset from UTC.
+    """
+    try:
+        time = datetime.fromisoformat(text.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            time = datetime.strptime(text, '%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            return None
+    if time.tzinfo is None:
+        time = time.replace(tzinfo=timezone(tz_offset))
+    return time
+
+def parse_query(query, tz_offset=timedelta(0)):
+    """Parse a query bar expression into filter fields.
+    
+    Supports field:value for level, component, file and message, @timestamp
+    compared with >, >=, < or <=, and bare words or quoted phrases searched
+    in the full entry. Values may be quoted. Times without a UTC offset are
+    read at tz_offset from UTC, the display timezone. Raises ValueError on bad
+    input, including a field given two different values.
+    """
+    result = {'component': None, 'level': None, 'file_name': None, 'start_ns': None,
+              'end_ns': None, 'search_terms': (), 'message_terms': ()}
+    for match in QUERY_TERM_RE.finditer(query):
+        field, op, value = match.group('field', 'op', 'value')
+        if field is None:
+            text = match.group('phrase') if match.group('phrase') is not None else match.group('word')
+            if text:
+                result['search_terms'] += (text.lower(),)
+            continue
+        if value.startswith('"'):
+            value = value[1:-1]
+        field = QUERY_FIELDS.get(field.lower())
+        if field is None:
+            # Not a field expression, e.g. a URL; search for it as typed
+            result['search_terms'] += (match.group().lower(),)
+            continue
+        if field == 'timestamp':
+            if op == ':':
+                raise ValueError("compare @timestamp with >, >=, < or <=")
+            time = parse_filter_time(value, tz_offset)
+            if time is None:
+                raise ValueError(f"invalid time '{value}'")
+            ns = datetime_to_ns(time, clamp=True)
+            if op == '>':
+                ns += 1
+            elif op == '<':
+                ns -= 1
+            if op.startswith('>'):
+                result['start_ns'] = ns if result['start_ns'] is None else max(result['start_ns'], ns)
+            else:
+                result['end_ns'] = ns if result['end_ns'] is None else min(result['end_ns'], ns)
+        elif op != ':':
+            raise ValueError(f"use {match.group('field')}:value")
+        elif field == 'message':
+            if value:
+                result['message_terms'] += (value.lower(),)
+        else:
+            # A log has one value per field, so two different values could never both match
+            if result[field] is not None and result[field].lower() != value.lower():
+                raise ValueError(f"{match.group('field')} is given more than once")
+            result[field] = value
+    return result
+
+def resolve_field_value(table, value):
+    """Return the stored value equal to a query value, ignoring case if there is no exact match"""
+    if value in table.codes:
+        return value
+    lowered = value.lower()
+    for stored in table.values:
+        if str(stored).lower() == lowered:
+            return stored
+    return value
+
+def filter_narrows(spec, base):
+    """Whether every log matched by filter spec is also matched by filter base.
+    
+    Specs are (start_ns, end_ns, component, level, file_name, search_terms,
+    search_pattern, message_terms) tuples as built by ServerViewer.apply_filters,
+    with None (or no terms) meaning no restriction.
+    """
+    start_ns, end_ns, *values, search_terms, search_pattern, message_terms = spec
+    base_start, base_end, *base_values, base_terms, base_pattern, base_message_terms = base
+    if base_start is not None and (start_ns is None or start_ns < base_start):
+        return False
+    if base_end is not None and (end_ns is None or end_ns > base_end):
+        return False
+    for value, base_value in zip(values, base_values):
+        if base_value is not None and value != base_value:
+            return False
+    if base_pattern is not None and search_pattern != base_pattern:
+        return False
+    # Text containing a term also contains any part of it, and messages are
+    # part of the search text
+    if not all(any(term in other for other in search_terms + message_terms) for term in base_terms):
+        return False
+    return all(any(term in other for other in message_terms) for term in base_message_terms)
+
+def intersect_rows(rows, other):
+    """Return the sorted rows present in both sorted row lists"""
+    if len(other) < len(rows):
+        rows, other = other, rows
+    return list(filter(set(other).__contains__, rows))
+
+def build_token_postings(texts, start=0):
+    """Map each search token to the positions, counted from start, of the texts containing it"""
+    postings = defaultdict(list)
+    for i, text in enumerate(texts, start):
+        for token in set(TOKEN_RE.findall(text)):
+            postings[token].append(i)
+    return {token: array('I', ids) for token, ids in postings.items()}
+
+def regex_literal_prefix(pattern):
+    """Return literal text that every match of a search regex starts with ('' if unknown)"""
+    if '|' in pattern:
+        return ''
+    if pattern.startswith('^'):
+        pattern = pattern[1:]
+    literal = []
+    for char in pattern:
+        if char in '*?{':
+            # The quantifier makes the preceding character optional
+            literal = literal[:-1]
+            break
+        if char in REGEX_SPECIAL:
+            break
+        literal.append(char)
+    literal = ''.join(literal)
+    # Case-insensitive matching folds some non-ASCII characters onto ASCII ones
+    return literal if literal.isascii() else ''
+
+def find_log_files(directory):
+    """Return the log files under a directory, sorted by path"""
+    files = set()
+    for pattern in LOG_FILE_PATTERNS:
+        files.update(path for path in Path(directory).rglob(pattern) if path.is_file())
+    return sorted(files)
+
+def datetime_to_ns(dt, clamp=False):
+    """Convert a parsed timestamp to epoch nanoseconds (datetime.min maps to NO_TIMESTAMP).
+    
+    Times the timestamp column cannot hold, such as Go's zero time in year 1,
+    also map to NO_TIMESTAMP, or with clamp to the nearest time it can hold.
+    """
+    if dt == datetime.min:
+        return NO_TIMESTAMP
+    if dt.tzinfo is None:
+        # Naive timestamps are treated as UTC
+        dt = dt.replace(tzinfo=timezone.utc)
+    ns = (dt - EPOCH) // timedelta(microseconds=1) * 1000
+    if MIN_TIMESTAMP_NS <= ns <= MAX_TIMESTAMP_NS:
+        return ns
+    if clamp:
+        return MIN_TIMESTAMP_NS if ns < MIN_TIMESTAMP_NS else MAX_TIMESTAMP_NS
+    return NO_TIMESTAMP
+
+def ns_to_datetime(ns):
+    """Convert epoch nanoseconds back to a UTC datetime (NO_TIMESTAMP maps to datetime.min)"""
+    if ns == NO_TIMESTAMP:
+        return datetime.min
+    return EPOCH + timedelta(microseconds=ns // 1000)
+
+def renumber_range_results(results):
+    """Convert range-relative line numbers from parse_file_range into file line numbers.
+    
+    Leading blank lines of the file are not counted, matching a stripped
+    whole-file read. Yields (entries, errors) per range, in order.
+    """
+    line_offset = 0
+    started = False
+    for entries, errors, line_count, leading_blank in results:
+        skip = 0 if started else leading_blank
+        shift = line_offset - skip
+        if shift:
+            for entry in entries:
+                entry.line_number += shift
+            errors = [(line_num + shift, error) for line_num, error in errors]
+        line_offset += line_count - skip
+        started = started or line_count > skip
+        yield entries, errors
+
+class InternTable:
+    """Interning dictionary mapping distinct values to small integer codes"""
+    def __init__(self):
+        self.codes = {}
+        self.values = []
+        
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+        
+    def codes_where(self, predicate):
+        """Return the set of codes whose value satisfies predicate"""
+        return {code for code, value in enumerate(self.values) if predicate(value)}
+        
+    def truncate(self, size):
+        """Forget every value encoded after the first size"""
+        for value in self.values[size:]:
+            del self.codes[value]
+        del self.values[size:]
+
+class TokenIndex:
+    """Inverted index from search tokens to the ids of the logs containing them.
+    
+    Tokens are maximal runs of word characters, so every token of a search
+    term lies inside a token of any text that contains the term. Partial
+    tokens are found through a trigram index over the token vocabulary.
+    """
+    def __init__(self):
+        self.postings = {}
+        self.tokens = []
+        # Trigram -> ids (positions in self.tokens) of the tokens containing it
+        self.trigrams = {}
+        
+    def add_postings(self, postings):
+        """Merge postings from build_token_postings, whose positions are log ids"""
+        for token, ids in postings.items():
+            existing = self.postings.get(token)
+            if existing is None:
+                self.postings[token] = ids
+                self._add_token(token)
+            else:
+                existing.extend(ids)
+                
+    def _add_token(self, token):
+        token_id = len(self.tokens)
+        self.tokens.append(token)
+        for trigram in {token[i:i + 3] for i in range(len(token) - 2)}:
+            ids = self.trigrams.get(trigram)
+            if ids is None:
+                ids = self.trigrams[trigram] = array('I')
+            ids.append(token_id)
+            
+    def _tokens_containing(self, fragment):
+        """Return the vocabulary tokens that may contain fragment"""
+        if len(fragment) < 3:
+            return self.tokens
+        id_lists = []
+        for trigram in {fragment[i:i + 3] for i in range(len(fragment) - 2)}:
+            ids = self.trigrams.get(trigram)
+            if ids is None:
+                return []
+            id_lists.append(ids)
+        id_lists.sort(key=len)
+        ids = set(id_lists[0])
+        for other in id_lists[1:]:
+            ids.intersection_update(other)
+        tokens = self.tokens
+        return [tokens[i] for i in ids]
+                
+    def candidates(self, term):
+        """Return (ids, exact) for a lowercased search term.
+        
+        ids covers every log whose search text contains term; exact is True
+        when all of them are known to match. ids is None if term has no tokens.
+        """
+        matches = list(TOKEN_RE.finditer(term))
+        if not matches:
+            return None, False
+            
+        token_lists = []
+        for match in matches:
+            token = match.group()
+            # A separator next to the token in the term pins that end to a token boundary
+            bounded_left = match.start() > 0
+            bounded_right = match.end() < len(term)
+            if bounded_left and bounded_right:
+                lists = [self.postings.get(token, ())]
+            else:
+                if bounded_left:
+                    matching = [t for t in self._tokens_containing(token) if t.startswith(token)]
+                elif bounded_right:
+                    matching = [t for t in self._tokens_containing(token) if t.endswith(token)]
+                else:
+                    matching = [t for t in self._tokens_containing(token) if token in t]
+                lists = [self.postings[t] for t in matching]
+            token_lists.append(lists)
+            
+        # Intersect starting from the rarest token
+        token_lists.sort(key=lambda lists: sum(map(len, lists)))
+        ids = set().union(*token_lists[0])
+        for lists in token_lists[1:]:
+            if not ids:
+                break
+            ids.intersection_update(set().union(*lists))
+        return ids, len(matches) == 1 and matches[0].group() == term
 
 class ServerGroup:
     """Represents a group of log files from one server"""
@@ -23,27 +922,433 @@ class ServerGroup:
         self.components = set()
         self.log_levels = set()
         self.loaded_files = set()
+        # Running per-level totals so get_stats never scans the logs. These sets
+        # and counters are replaced, never changed in place, so the UI can read
+        # them without the lock
+        self.level_totals = Counter()
+        # Guards the group against concurrent loader threads
+        self.lock = threading.RLock()
+        # Serializes token index builds, which run without holding self.lock
+        self.index_lock = threading.Lock()
+        # Bumped by clear() so loads started before a clear are discarded
+        self.generation = 0
+        # Bumped whenever the logs change, so cached filter results can be invalidated
+        self.version = 0
+        self._init_columns()
+        
+    def _init_columns(self):
+        # Columnar copy of the fields analyses count and filter on, row-aligned
+        # with self.logs: epoch-ns timestamps plus codes into interned tables
+        self.ts_ns = array('q')
+        self.level_codes = array('I')
+        self.component_codes = array('I')
+        self.file_codes = array('I')
+        self.template_ids = array('I')
+        self.level_table = InternTable()
+        self.component_table = InternTable()
+        self.file_table = InternTable()
+        # Search index over stable record ids (assigned in load order), with
+        # rids mapping rows to ids and rows_by_rid mapping them back. Records
+        # are tokenized on the first search after they load, not while loading;
+        # indexed_rids counts the ids already in the index
+        self.rids = array('I')
+        self.rows_by_rid = array('I')
+        self.token_index = TokenIndex()
+        self.indexed_rids = 0
+        # Per-code record id lists for each filterable field, indexed by code
+        self.level_rids = []
+        self.component_rids = []
+        self.file_rids = []
+        
+    def _columns(self):
+        return (self.ts_ns, self.level_codes, self.component_codes, self.file_codes, self.template_ids,
+                self.rids)
+        
+    def _encode_columns(self, logs, timestamps, rids):
+        """Build a batch's column values, except its template ids (see add_logs).
+        
+        Values interned for the batch are forgotten again if encoding fails.
+        """
+        tables = (self.level_table, self.component_table, self.file_table)
+        sizes = [len(table.values) for table in tables]
+        try:
+            return [
+                array('q', timestamps),
+                array('I', [self.level_table.encode(log.level) for log in logs]),
+                array('I', [self.component_table.encode(log.component) for log in logs]),
+                array('I', [self.file_table.encode(log.file_name) for log in logs]),
+                array('I', rids),
+            ]
+        except Exception:
+            for table, size in zip(tables, sizes):
+                table.truncate(size)
+            raise
+        
+    @staticmethod
+    def _extend_postings(postings, codes, rids):
+        for code, rid in zip(codes, rids):
+            while len(postings) <= code:
+                postings.append(array('I'))
+            postings[code].append(rid)
+            
+    def _map_rows(self, start):
+        """Update rows_by_rid for every row from start on"""
+        rows_by_rid = self.rows_by_rid
+        missing = len(self.rids) - len(rows_by_rid)
+        if missing > 0:
+            rows_by_rid.frombytes(bytes(missing * rows_by_rid.itemsize))
+        for row, rid in enumerate(islice(self.rids, start, None), start):
+            rows_by_rid[rid] = row
         
     def add_log(self, processed_log):
-        self.logs.append(processed_log)
-        self.components.add(processed_log['component'])
-        self.log_levels.add(processed_log['level'])
+        self.add_logs([processed_log])
+        
+    def add_logs(self, new_logs):
+        """Merge a batch of logs into the time-ordered log list.
+        
+        Batches that are already in timestamp order skip the sort, and a batch
+        that starts after the loaded data is appended without merging.
+        Each log is given its message template id.
+        
+        Everything that can fail is built before the group or the shared
+        templates change, so a batch that raises leaves no trace.
+        """
+        if not new_logs:
+            return
+            
+        base = len(self.logs)
+        new_rids = range(base, base + len(new_logs))
+            
+        new_ts = [log.timestamp_ns for log in new_logs]
+        if not all(map(le, new_ts, islice(new_ts, 1, None))):
+            order = sorted(range(len(new_ts)), key=new_ts.__getitem__)
+            new_logs = [new_logs[i] for i in order]
+            new_ts = [new_ts[i] for i in order]
+            new_rids = [base + i for i in order]
+            
+        columns = self._encode_columns(new_logs, new_ts, new_rids)
+        
+        # The batch is accepted: commit it to the templates and columns
+        LOG_TEMPLATES.assign(new_logs)
+        columns.insert(4, array('I', [log.template_id for log in new_logs]))
+        self.version += 1
+        self._extend_postings(self.level_rids, columns[1], new_rids)
+        self._extend_postings(self.component_rids, columns[2], new_rids)
+        self._extend_postings(self.file_rids, columns[3], new_rids)
+            
+        if not self.logs or self.ts_ns[-1] <= new_ts[0]:
+            self.logs.extend(new_logs)
+            for column, values in zip(self._columns(), columns):
+                column.extend(values)
+            self._map_rows(base)
+        elif new_ts[-1] < self.ts_ns[0]:
+            self.logs[:0] = new_logs
+            (self.ts_ns, self.level_codes, self.component_codes, self.file_codes, self.template_ids,
+             self.rids) = (values + column for column, values in zip(self._columns(), columns))
+            self._map_rows(0)
+        else:
+            # Stable merge: on equal timestamps existing logs stay first, as with a full sort
+            merged = heapq.merge(zip(*self._columns(), self.logs), zip(*columns, new_logs),
+                                 key=itemgetter(0))
+            ts_ns, level_codes, component_codes, file_codes, template_ids, rids, logs = zip(*merged)
+            self.logs = list(logs)
+            self.ts_ns = array('q', ts_ns)
+            self.level_codes = array('I', level_codes)
+            self.component_codes = array('I', component_codes)
+            self.file_codes = array('I', file_codes)
+            self.template_ids = array('I', template_ids)
+            self.rids = array('I', rids)
+            self._map_rows(0)
+            
+        # Running totals only count logs that made it into the columns
+        levels = Counter(log.level for log in new_logs)
+        self.components = self.components.union(log.component for log in new_logs)
+        self.log_levels = self.log_levels.union(levels)
+        self.level_totals = self.level_totals + levels
         
     def clear(self):
-        self.logs = []
-        self.components = set()
-        self.log_levels = set()
-        self.loaded_files = set()
+        with self.lock:
+            self.logs = []
+            self.components = set()
+            self.log_levels = set()
+            self.loaded_files = set()
+            self.level_totals = Counter()
+            self._init_columns()
+            self.generation += 1
+            self.version += 1
+            
+    def index_new_logs(self):
+        """Add the logs loaded since the last call to the token index.
+        
+        The logs are tokenized without holding the group lock, which is only
+        taken to list them and to merge the postings, so loads and the UI are
+        not held up while a large index is built.
+        """
+        with self.index_lock:
+            with self.lock:
+                generation = self.generation
+                base = self.indexed_rids
+                logs = [self.logs[self.rows_by_rid[rid]] for rid in range(base, len(self.rids))]
+            if not logs:
+                return
+            postings = build_token_postings(
+                map(record_search_text, logs), base)
+            with self.lock:
+                # A clear while tokenizing has started a new, empty index
+                if self.generation == generation:
+                    self.token_index.add_postings(postings)
+                    self.indexed_rids = base + len(logs)
+        
+    def search_rows(self, term, regex=False):
+        """Return (rows, exact): the rows, in order, whose search text may contain term.
+        
+        With regex True, term is a pattern and rows may contain its literal
+        prefix. exact is True when every returned row is known to match. rows
+        is None when the index cannot narrow the search. Logs not yet added by
+        index_new_logs are always returned, and make the result inexact.
+        """
+        if regex:
+            prefix = regex_literal_prefix(term)
+            ids = self.token_index.candidates(prefix.lower())[0] if prefix else None
+            exact = False
+        else:
+            ids, exact = self.token_index.candidates(term)
+        if ids is None:
+            return None, False
+        if self.indexed_rids < len(self.rids):
+            ids = ids.union(range(self.indexed_rids, len(self.rids)))
+            exact = False
+        return sorted(map(self.rows_by_rid.__getitem__, ids)), exact
+        
+    def time_range_rows(self, start_ns=None, end_ns=None):
+        """Return the (start, stop) rows of logs timestamped within [start_ns, end_ns]"""
+        start = 0 if start_ns is None else bisect_left(self.ts_ns, start_ns)
+        stop = len(self.ts_ns) if end_ns is None else bisect_right(self.ts_ns, end_ns)
+        return start, max(start, stop)
+        
+    def select_rows(self, start_ns=None, end_ns=None, component=None, level=None, file_name=None,
+                    rows=None):
+        """Return, in order, the rows in the time range whose fields equal the given values.
+        
+        None means no restriction; rows optionally limits the result to a
+        sorted list of candidate rows. The smallest of the time slice, the
+        candidates and the per-value record lists drives the scan, and the
+        remaining conditions are checked against the columns. A range is
+        returned when only the time range applies.
+        """
+        start, stop = self.time_range_rows(start_ns, end_ns)
+        checks = []
+        for value, table, codes, postings in (
+                (component, self.component_table, self.component_codes, self.component_rids),
+                (level, self.level_table, self.level_codes, self.level_rids),
+                (file_name, self.file_table, self.file_codes, self.file_rids)):
+            if value is None:
+                continue
+            code = table.codes.get(value)
+            if code is None:
+                return []
+            checks.append((codes, code, postings[code]))
+            
+        selected = range(start, stop)
+        if rows is not None:
+            selected = rows = rows[bisect_left(rows, start):bisect_left(rows, stop)]
+        smallest = min(checks, key=lambda check: len(check[2]), default=None)
+        if smallest is not None and len(smallest[2]) < len(selected):
+            checks.remove(smallest)
+            selected = sorted(map(self.rows_by_rid.__getitem__, smallest[2]))
+            selected = selected[bisect_left(selected, start):bisect_left(selected, stop)]
+            if rows is not None:
+                selected = list(filter(set(rows).__contains__, selected))
+        for codes, code, _ in checks:
+            selected = list(compress(selected, map(code.__eq__, map(codes.__getitem__, selected))))
+        return selected
+        
+    def first_timed_row(self):
+        """Index of the first log with a timestamp (untimestamped logs sort first)"""
+        return bisect_right(self.ts_ns, NO_TIMESTAMP)
+        
+    def level_counts(self):
+        """Count logs per level value"""
+        with self.lock:
+            counts = Counter(self.level_codes)
+            values = self.level_table.values
+        return Counter({values[code]: count for code, count in counts.items()})
+        
+    def component_level_counts(self):
+        """Count logs per (component, level) pair"""
+        with self.lock:
+            counts = Counter(zip(self.component_codes, self.level_codes))
+            components = self.component_table.values
+            levels = self.level_table.values
+        return Counter({(components[comp], levels[level]): count
+                        for (comp, level), count in counts.items()})
+        
+    def component_template_counts(self):
+        """Count logs per (component, template id) pair"""
+        with self.lock:
+            counts = Counter(zip(self.component_codes, self.template_ids))
+            components = self.component_table.values
+        return Counter({(components[comp], template_id): count
+                        for (comp, template_id), count in counts.items()})
+        
+    def component_time_bounds(self):
+        """Return {component: (first_ns, last_ns, count)} over logs with timestamps"""
+        with self.lock:
+            start = self.first_timed_row()
+            codes = self.component_codes[start:]
+            timestamps = self.ts_ns[start:]
+            components = self.component_table.values
+        # Rows are time-sorted: the last assignment per key wins
+        last = dict(zip(codes, timestamps))
+        first = dict(zip(reversed(codes), reversed(timestamps)))
+        counts = Counter(codes)
+        return {components[code]: (first[code], last[code], counts[code]) for code in last}
+        
+    def rows_with_levels(self, predicate):
+        """Return the logs whose level satisfies predicate, in time order"""
+        with self.lock:
+            codes = self.level_table.codes_where(predicate)
+            return list(compress(self.logs, map(codes.__contains__, self.level_codes)))
         
     def get_stats(self):
+        # Proportional to the number of distinct levels, not the number of logs
+        level_counts = self.level_totals.items()
         return {
             'total_logs': len(self.logs),
             'components': len(self.components),
             'files': len(self.loaded_files),
-            'errors': len([log for log in self.logs if log['level'].lower() == 'error']),
-            'warnings': len([log for log in self.logs if log['level'].lower() in ['warn', 'warning']])
+            'errors': sum(count for level, count in level_counts if level.lower() == 'error'),
+            'warnings': sum(count for level, count in level_counts if level.lower() in ['warn', 'warning'])
         }
 
+class LoadQueue:
+    """Bounded pool of daemon loader threads fed from a job queue.
+    
+    Tracks the servers touched by the current batch of jobs and calls
+    on_batch_done(server_names, failures) once, when the queue drains.
+    """
+    def __init__(self, max_workers, on_batch_done):
+        self.max_workers = max_workers
+        self.on_batch_done = on_batch_done
+        self.jobs = queue.Queue()
+        self.lock = threading.Lock()
+        self.workers = []
+        self.pending = 0
+        self.batch_servers = set()
+        self.batch_failures = []
+        
+    def submit(self, server_name, label, func, *args):
+        """Queue func(*args) as a job loading data into server_name"""
+        with self.lock:
+            self.pending += 1
+            self.batch_servers.add(server_name)
+            if len(self.workers) < min(self.max_workers, self.pending):
+                worker = threading.Thread(target=self._worker, daemon=True)
+                self.workers.append(worker)
+                worker.start()
+        self.jobs.put((label, func, args))
+        
+    def _worker(self):
+        while True:
+            label, func, args = self.jobs.get()
+            try:
+                func(*args)
+            except Exception as e:
+                with self.lock:
+                    self.batch_failures.append((label, e))
+                    
+            with self.lock:
+                self.pending -= 1
+                if self.pending:
+                    continue
+                servers, failures = self.batch_servers, self.batch_failures
+                self.batch_servers, self.batch_failures = set(), []
+            self.on_batch_done(servers, failures)
+
+# (str1, str2) -> (score, exact) shared by all similarity searches; score is
+# ratio() when exact, otherwise the quick_ratio() upper bound that pruned the pair
+SIMILARITY_SCORES = LRUCache(SIMILARITY_SCORE_CACHE_SIZE)
+
+class SimilarityMatcher:
+    """Scores message pairs with difflib, skipping pairs that cannot reach a threshold.
+    
+    ratio() is only run when the length bound and quick_ratio() both allow
+    the threshold, so the scores that are returned are exactly ratio().
+    A SequenceMatcher is kept per second string, which keeps the index
+    difflib builds for it across pairs. Scores are remembered in
+    SIMILARITY_SCORES, so later runs, with any threshold, reuse them.
+    """
+    def __init__(self, threshold, cache_size=SIMILARITY_MATCHER_CACHE_SIZE, scores=SIMILARITY_SCORES):
+        self.threshold = threshold
+        self.matchers = LRUCache(cache_size)
+        self.scores = scores
+        
+    def score(self, str1, str2):
+        """Return ratio() of str1 against str2, or None if it is below the threshold"""
+        total = len(str1) + len(str2)
+        # Same value as real_quick_ratio(), without building a matcher
+        if total and 2.0 * min(len(str1), len(str2)) / total < self.threshold:
+            return None
+        key = (str1, str2)
+        cached = self.scores.get(key)
+        if cached is not None and (cached[1] or cached[0] < self.threshold):
+            return cached[0] if cached[0] >= self.threshold else None
+            
+        matcher = self.matchers.get(str2)
+        if matcher is None:
+            matcher = difflib.SequenceMatcher(None, b=str2)
+            self.matchers.put(str2, matcher)
+        matcher.set_seq1(str1)
+        bound = matcher.quick_ratio()
+        if bound < self.threshold:
+            self.scores.put(key, (bound, False))
+            return None
+        similarity = matcher.ratio()
+        self.scores.put(key, (similarity, True))
+        return similarity if similarity >= self.threshold else None
+
+class MinHashIndex:
+    """Finds candidate near-duplicate messages with MinHash and locality-sensitive hashing.
+    
+    A message's signature holds, for each of MINHASH_BANDS * MINHASH_ROWS
+    hash functions, the minimum hash over its character shingles; two
+    messages agree on a row with probability close to the Jaccard similarity
+    of their shingle sets. Messages agreeing on every row of a band share
+    that band's bucket, and only messages sharing a bucket are paired.
+    The hash functions are the shingle's string hash XORed with a random
+    mask per row, which keeps signatures cheap to compute. Signatures are
+    kept between runs, packed as 8 bytes per row.
+    """
+    HASH_MASK = (1 << 61) - 1
+    
+    def __init__(self, cache_size=MINHASH_CACHE_SIZE):
+        rng = random.Random(0)
+        self.row_masks = [rng.getrandbits(61) for _ in range(MINHASH_BANDS * MINHASH_ROWS)]
+        self.signatures = LRUCache(cache_size)
+        
+    def signature(self, text):
+        """Return the MinHash signature of text as packed unsigned 64-bit rows"""
+        signature = self.signatures.get(text)
+        if signature is None:
+            size = MINHASH_SHINGLE_SIZE
+            mask = self.HASH_MASK
+            shingles = {hash(text[i:i + size]) & mask for i in range(max(1, len(text) - size + 1))}
+            signature = array('Q', [min(map(row_mask.__xor__, shingles))
+                                    for row_mask in self.row_masks]).tobytes()
+            self.signatures.put(text, signature)
+        return signature
+        
+    def buckets(self, texts):
+        """Return the lists of positions in texts whose messages share a bucket"""
+        buckets = defaultdict(list)
+        band_size = MINHASH_ROWS * array('Q').itemsize
+        for i, text in enumerate(texts):
+            signature = self.signature(text)
+            for band in range(MINHASH_BANDS):
+                start = band * band_size
+                buckets[(band, signature[start:start + band_size])].append(i)
+        return [members for members in buckets.values() if len(members) > 1]
+
 class ComparisonEngine:
     """Handles comparison logic between server groups"""
     
@@ -53,44 +1358,181 @@ class ComparisonEngine:
         return difflib.SequenceMatcher(None, str1, str2).ratio()
     
     @staticmethod
-    def find_similar_messages(logs1, logs2, similarity_threshold=0.7, time_window_minutes=5):
-        """Find similar messages between two log sets within time windows"""
+    def minutes_apart(ns1, ns2):
+        """Absolute difference between two epoch-ns timestamps in minutes"""
+        # Same arithmetic as timedelta.total_seconds(), so window edges compare identically
+        return abs((ns1 - ns2) // 1000 / 1_000_000) / 60
+        
+    @staticmethod
+    def window_pairs(times1, times2, time_window_minutes):
+        """Yield (i, j) for every pair of timestamps within time_window_minutes.
+        
+        Both lists must be in ascending order. A window over times2 slides
+        forward as times1 advances, so only pairs inside it are visited;
+        pairs come out ordered by i, then j.
+        """
+        minutes_apart = ComparisonEngine.minutes_apart
+        start = end = 0
+        count = len(times2)
+        for i, t1 in enumerate(times1):
+            while start < count and times2[start] < t1 and minutes_apart(t1, times2[start]) > time_window_minutes:
+                start += 1
+            end = max(end, start)
+            while end < count and (times2[end] < t1 or minutes_apart(t1, times2[end]) <= time_window_minutes):
+                end += 1
+            for j in range(start, end):
+                yield i, j
+    
+    @staticmethod
+    def find_similar_messages(logs1, logs2, similarity_threshold=0.7, time_window_minutes=5,
+                              by_template=False):
+        """Find similar messages between two log sets within time windows.
+        
+        With by_template, logs are compared by their message templates: logs
+        of the same template are identical, and each pair of different
+        templates is scored once.
+        """
         correlations = []
         
         # Focus on errors and warnings for correlation
-        important_logs1 = [log for log in logs1 if log['level'].lower() in ['error', 'warn', 'warning']]
-        important_logs2 = [log for log in logs2 if log['level'].lower() in ['error', 'warn', 'warning']]
-        
-        for log1 in important_logs1:
-            if log1['parsed_timestamp'] == datetime.min:
-                continue
-                
-            for log2 in important_logs2:
-                if log2['parsed_timestamp'] == datetime.min:
-                    continue
-                
-                # Check time correlation (within time window)
-                time_diff = abs((log1['parsed_timestamp'] - log2['parsed_timestamp']).total_seconds()) / 60
-                if time_diff > time_window_minutes:
-                    continue
-                
-                # Check message similarity
-                similarity = ComparisonEngine.calculate_similarity(
-                    log1['full_message'].lower(), 
-                    log2['full_message'].lower()
-                )
-                
-                if similarity >= similarity_threshold:
-                    correlations.append({
-                        'log1': log1,
-                        'log2': log2,
-                        'similarity': similarity,
-                        'time_diff_minutes': time_diff,
-                        'correlation_type': 'message_similarity'
-                    })
+        important_logs1 = [log for log in logs1 if log.level.lower() in ['error', 'warn', 'warning']
+                           and log.timestamp_ns != NO_TIMESTAMP]
+        important_logs2 = [log for log in logs2 if log.level.lower() in ['error', 'warn', 'warning']
+                           and log.timestamp_ns != NO_TIMESTAMP]
+        
+        # Server logs are time-ordered already; other input is joined in time order
+        # and the pairs put back in input order, so results keep the same order
+        ordered = []
+        for logs in (important_logs1, important_logs2):
+            times = [log.timestamp_ns for log in logs]
+            if all(map(le, times, islice(times, 1, None))):
+                ordered.append((logs, times))
+            else:
+                order = sorted(range(len(logs)), key=times.__getitem__)
+                ordered.append(([logs[i] for i in order], [times[i] for i in order]))
+        (sorted_logs1, times1), (sorted_logs2, times2) = ordered
+        pairs = ((sorted_logs1[i], sorted_logs2[j])
+                 for i, j in ComparisonEngine.window_pairs(times1, times2, time_window_minutes))
+        if sorted_logs1 is not important_logs1 or sorted_logs2 is not important_logs2:
+            position1 = {id(log): i for i, log in enumerate(important_logs1)}
+            position2 = {id(log): i for i, log in enumerate(important_logs2)}
+            pairs = sorted(pairs, key=lambda pair: (position1[id(pair[0])], position2[id(pair[1])]))
+        
+        # Repeated messages share one lowercased string, and each distinct pair of
+        # messages (or templates) is scored once
+        matcher = SimilarityMatcher(similarity_threshold)
+        lowered = {}
+        pair_scores = {}
+        if not by_template:
+            distinct = {}
+            for log in chain(important_logs1, important_logs2):
+                text = distinct.get(log.full_message)
+                if text is None:
+                    text = distinct[log.full_message] = log.full_message.lower()
+                lowered[id(log)] = text
+        
+        for log1, log2 in pairs:
+            time_diff = ComparisonEngine.minutes_apart(log1.timestamp_ns, log2.timestamp_ns)
+            
+            # Check message similarity
+            if by_template:
+                key = (log1.template_id, log2.template_id)
+            else:
+                key = (lowered[id(log1)], lowered[id(log2)])
+            if key not in pair_scores:
+                if not by_template:
+                    pair_scores[key] = matcher.score(*key)
+                elif key[0] == key[1]:
+                    pair_scores[key] = 1.0 if similarity_threshold <= 1.0 else None
+                else:
+                    pair_scores[key] = matcher.score(LOG_TEMPLATES.template(key[0]).lower(),
+                                                     LOG_TEMPLATES.template(key[1]).lower())
+            similarity = pair_scores[key]
+            
+            if similarity is not None:
+                correlations.append({
+                    'log1': log1,
+                    'log2': log2,
+                    'similarity': similarity,
+                    'time_diff_minutes': time_diff,
+                    'correlation_type': 'message_similarity'
+                })
         
         return sorted(correlations, key=lambda x: x['similarity'], reverse=True)
     
+    @staticmethod
+    def find_fleet_clusters(server_logs, similarity_threshold=0.7, index=None):
+        """Group similar error and warning messages across any number of servers.
+        
+        server_logs maps server names to logs. Messages are normalized
+        (lowercased, digit runs replaced) and deduplicated, and only pairs of
+        distinct messages colliding in the MinHash index get an exact score,
+        so groups are approximate.
+        Returns the groups seen on at least two servers, most frequent first.
+        """
+        index = index or MinHashIndex()
+        
+        # Distinct normalized message -> per-server counts, plus the first original seen
+        counts = defaultdict(Counter)
+        examples = {}
+        for server, logs in server_logs.items():
+            for log in logs:
+                if log.level.lower() in ['error', 'warn', 'warning']:
+                    text = NUMBER_RE.sub('0', str(log.full_message).lower())
+                    counts[text][server] += 1
+                    examples.setdefault(text, str(log.full_message))
+        texts = list(counts)
+        
+        # Union similar messages into groups. Within a bucket each message is scored
+        # against one member of each group already there, so a bucket of
+        # near-identical messages costs about one comparison per message
+        parent = list(range(len(texts)))
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+            
+        matcher = SimilarityMatcher(similarity_threshold)
+        for members in index.buckets(texts):
+            representatives = []
+            for i in members:
+                root = find(i)
+                grouped = False
+                compared = set()
+                for representative in representatives:
+                    rep_root = find(representative)
+                    if rep_root == root:
+                        grouped = True
+                    elif rep_root not in compared:
+                        compared.add(rep_root)
+                        if matcher.score(texts[i], texts[representative]) is not None:
+                            parent[root] = root = rep_root
+                            grouped = True
+                if not grouped:
+                    representatives.append(i)
+                
+        groups = defaultdict(list)
+        for i in range(len(texts)):
+            groups[find(i)].append(texts[i])
+            
+        clusters = []
+        for members in groups.values():
+            servers = Counter()
+            for text in members:
+                servers.update(counts[text])
+            if len(servers) < 2:
+                continue
+            members.sort(key=lambda text: sum(counts[text].values()), reverse=True)
+            clusters.append({
+                'messages': [examples[text] for text in members],
+                'servers': servers,
+                'count': sum(servers.values()),
+                'correlation_type': 'fleet_similarity'
+            })
+        
+        return sorted(clusters, key=lambda x: x['count'], reverse=True)
+    
     @staticmethod
     def find_timeline_correlations(logs1, logs2, time_window_minutes=2):
         """Find timeline correlations - events happening at similar times"""
@@ -110,13 +1552,13 @@ class ComparisonEngine:
         buckets2 = defaultdict(list)
         
         for log in logs1:
-            if log['parsed_timestamp'] != datetime.min:
-                bucket = get_time_bucket(log['parsed_timestamp'])
+            if log.parsed_timestamp != datetime.min:
+                bucket = get_time_bucket(log.parsed_timestamp)
                 buckets1[bucket].append(log)
                 
         for log in logs2:
-            if log['parsed_timestamp'] != datetime.min:
-                bucket = get_time_bucket(log['parsed_timestamp'])
+            if log.parsed_timestamp != datetime.min:
+                bucket = get_time_bucket(log.parsed_timestamp)
                 buckets2[bucket].append(log)
         
         # Find correlating time periods
@@ -129,8 +1571,8 @@ class ComparisonEngine:
                     bucket2_logs = buckets2[check_bucket]
                     
                     # Look for interesting correlations in this time period
-                    bucket1_errors = [log for log in bucket1_logs if log['level'].lower() == 'error']
-                    bucket2_errors = [log for log in bucket2_logs if log['level'].lower() == 'error']
+                    bucket1_errors = [log for log in bucket1_logs if log.level.lower() == 'error']
+                    bucket2_errors = [log for log in bucket2_logs if log.level.lower() == 'error']
                     
                     if bucket1_errors and bucket2_errors:
                         correlations.append({
@@ -159,8 +1601,22 @@ class MultiServerLogViewer:
         self.next_server_letter = 'A'  # Track next available letter
         
         self.comparison_results = []
+        # MinHash signatures of messages, reused by repeated fleet similarity runs
+        self.minhash_index = MinHashIndex()
         self.timezone_var = tk.StringVar(value="UTC")
         
+        # Parallel parsing of large files
+        self.parse_workers = DEFAULT_PARSE_WORKERS
+        self._parse_pool = None
+        self._parse_pool_workers = 0
+        self._parse_pool_lock = threading.Lock()
+        
+        # When off, records keep only the file offset of their line and re-read raw JSON on demand
+        self.keep_raw_var = tk.BooleanVar(value=True)
+        
+        # Bounded pool that loads many files for many servers at once
+        self.load_queue = LoadQueue(LOAD_QUEUE_WORKERS, self._on_load_batch_done)
+        
         # Setup GUI containers and menus
         self.create_widgets()
         self.setup_layout()
@@ -278,6 +1734,12 @@ class MultiServerLogViewer:
                                        command=lambda sk=server_key: self.load_file(sk))
             self.file_menu.add_command(label=f"Add to {display_name}",
                                        command=lambda sk=server_key: self.add_file(sk))
+            self.file_menu.add_command(label=f"Add Directory to {display_name}",
+                                       command=lambda sk=server_key: self.add_directory(sk))
+        
+        self.file_menu.add_separator()
+        self.file_menu.add_command(label="Load Servers from Directory...",
+                                   command=self.load_servers_from_directory)
         
         self.file_menu.add_separator()
         
@@ -333,6 +1795,11 @@ class MultiServerLogViewer:
         
         self.settings_menu.add_separator()
         self.settings_menu.add_command(label="Reset All Names", command=self.reset_server_names)
+        
+        self.settings_menu.add_separator()
+        self.settings_menu.add_command(label=f"Parse Workers ({self.parse_workers})...",
+                                       command=self.set_parse_workers)
+        self.settings_menu.add_checkbutton(label="Keep Raw JSON in Memory", variable=self.keep_raw_var)
     
     def create_widgets(self):
         """Initialize menubar, main frame, notebook, and comparison tab"""
@@ -364,7 +1831,7 @@ class MultiServerLogViewer:
         self.main_frame = ttk.Frame(self.root)
         
         # Status bar
-        self.status_var = tk.StringVar(value="Ready - Load log files to servers")
+        self.status_var = tk.StringVar(value=f"Ready - Load log files to servers | JSON decoder: {JSON_DECODER}")
         self.status_bar = ttk.Label(self.main_frame, textvariable=self.status_var, relief=tk.SUNKEN)
         
         # Main notebook for tabs
@@ -397,6 +1864,7 @@ class MultiServerLogViewer:
         ttk.Button(control_frame, text="Run Full Comparison", command=self.run_comparison).pack(side=tk.LEFT, padx=5)
         ttk.Button(control_frame, text="Timeline Analysis", command=self.run_timeline_correlation).pack(side=tk.LEFT, padx=5)
         ttk.Button(control_frame, text="Message Similarity", command=self.run_message_similarity).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Fleet Similarity", command=self.run_fleet_similarity).pack(side=tk.LEFT, padx=5)
         ttk.Button(control_frame, text="Export Results", command=self.export_results).pack(side=tk.LEFT, padx=5)
         
         # Server selection frame
@@ -421,6 +1889,10 @@ class MultiServerLogViewer:
         self.similarity_var = tk.StringVar(value="0.7")
         ttk.Entry(settings_frame, textvariable=self.similarity_var, width=5).pack(side=tk.LEFT, padx=2)
         
+        # Compare message templates rather than the raw message text
+        self.by_template_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(settings_frame, text="By Template", variable=self.by_template_var).pack(side=tk.LEFT, padx=(10,0))
+        
         # Results display
         self.comparison_text = scrolledtext.ScrolledText(self.comparison_frame, wrap=tk.WORD, height=35)
         self.comparison_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -484,126 +1956,177 @@ class MultiServerLogViewer:
         
     # File operations
     def load_file(self, server_name):
-        file_path = filedialog.askopenfilename(
-            title=f"Load Log File to {server_name}",
+        file_paths = filedialog.askopenfilenames(
+            title=f"Load Log Files to {server_name}",
             filetypes=[("All Files", "*.*"), ("Log Files", "*.log"), ("JSON Files", "*.json")]
         )
         
-        if file_path:
+        if file_paths:
             self.server_groups[server_name].clear()
-            threading.Thread(target=self._load_file_thread, args=(file_path, server_name), daemon=True).start()
+            self._queue_files(server_name, file_paths)
             
     def add_file(self, server_name):
-        file_path = filedialog.askopenfilename(
-            title=f"Add Log File to {server_name}",
+        file_paths = filedialog.askopenfilenames(
+            title=f"Add Log Files to {server_name}",
             filetypes=[("All Files", "*.*"), ("Log Files", "*.log"), ("JSON Files", "*.json")]
         )
         
-        if file_path:
-            file_name = Path(file_path).name
-            if file_name in self.server_groups[server_name].loaded_files:
-                messagebox.showwarning("Warning", f"File '{file_name}' is already loaded to {server_name}")
-                return
-            threading.Thread(target=self._load_file_thread, args=(file_path, server_name), daemon=True).start()
+        if file_paths:
+            self._queue_files(server_name, file_paths)
             
+    def add_directory(self, server_name):
+        directory = filedialog.askdirectory(title=f"Add Log Directory to {server_name}")
         
-    def _load_file_thread(self, file_path, server_name):
-        try:
-            file_name = Path(file_path).name
-            self.status_var.set(f"Loading {file_name} to {server_name}...")
-            
-            server_group = self.server_groups[server_name]
-            server_group.loaded_files.add(file_name)
+        if directory:
+            file_paths = find_log_files(directory)
+            if not file_paths:
+                messagebox.showwarning("Warning", f"No log files found in {directory}")
+                return
+            self._queue_files(server_name, file_paths, directory)
             
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-                
-            lines = content.split('\n') if '\n' in content else [content]
-            new_logs = []
+    def load_servers_from_directory(self):
+        """Load each subdirectory of a folder into its own server tab"""
+        directory = filedialog.askdirectory(title="Select Folder with One Subfolder per Server")
+        if not directory:
+            return
             
-            for line_num, line in enumerate(lines, 1):
-                line = line.strip()
-                if not line:
-                    continue
+        server_dirs = []
+        for subdir in sorted(Path(directory).iterdir()):
+            if subdir.is_dir():
+                file_paths = find_log_files(subdir)
+                if file_paths:
+                    server_dirs.append((subdir, file_paths))
                     
-                try:
-                    log_entry = json.loads(line)
-                    processed_entry = self.process_log_entry(log_entry, line_num, file_name, server_name)
-                    if processed_entry:
-                        new_logs.append(processed_entry)
-                        server_group.add_log(processed_entry)
-                except json.JSONDecodeError as e:
-                    print(f"Error parsing line {line_num} in {file_name}: {e}")
-                    continue
-            
-            # Sort logs by timestamp
-            server_group.logs.sort(key=lambda x: x.get('parsed_timestamp', datetime.min))
+        if not server_dirs:
+            messagebox.showwarning("Warning", f"No subfolders with log files found in {directory}")
+            return
             
-            # Update UI on main thread
-            self.root.after(0, self._update_ui_after_load, server_name, file_path, len(new_logs))
+        # Reuse empty server tabs before adding new ones
+        empty_servers = [sk for sk in sorted(self.server_groups.keys())
+                         if not self.server_groups[sk].loaded_files]
+        for subdir, file_paths in server_dirs:
+            server_key = empty_servers.pop(0) if empty_servers else self.add_server_tab()
+            self.set_server_display_name(server_key, subdir.name)
+            self._queue_files(server_key, file_paths, subdir)
             
-        except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("Error", f"Failed to load file: {str(e)}"))
-            self.status_var.set("Error loading file")
-            
-    def process_log_entry(self, entry, line_num, file_name, server_name):
-        """Process and normalize a log entry"""
-        processed = {
-            'raw': entry,
-            'line_number': line_num,
-            'file_name': file_name,
-            'server_name': server_name
-        }
+        self.update_menus()
+        self.update_server_selection()
         
-        # Extract timestamp
-        timestamp_str = entry.get('@timestamp', '')
-        if timestamp_str:
-            try:
-                utc_timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-                processed['parsed_timestamp'] = utc_timestamp
+    def _queue_files(self, server_name, file_paths, directory=None):
+        """Queue files for loading, skipping ones already loaded to the server.
+        
+        Files are tracked by resolved path. Files found under directory are
+        labelled with their path relative to it, so same-named files in
+        different subfolders stay apart; others by their file name.
+        """
+        server_group = self.server_groups[server_name]
+        with server_group.lock:
+            generation = server_group.generation
+            skipped = []
+            for file_path in file_paths:
+                path = Path(file_path).resolve()
+                file_name = Path(file_path).relative_to(directory).as_posix() if directory else path.name
+                if str(path) in server_group.loaded_files:
+                    skipped.append(file_name)
+                    continue
+                self.load_queue.submit(server_name, file_name, self._load_file_thread,
+                                       str(path), file_name, server_name, server_group, generation,
+                                       self.keep_raw_var.get())
                 
-                # Convert to selected timezone for display
-                local_timestamp = self.convert_timezone(utc_timestamp)
-                tz_name = self.get_timezone_name()
-                processed['timestamp'] = local_timestamp.strftime(f'%Y-%m-%d %H:%M:%S {tz_name}')
-            except:
-                processed['timestamp'] = timestamp_str
-                processed['parsed_timestamp'] = datetime.min
+        if skipped:
+            messagebox.showwarning("Warning", f"Already loaded to {server_name}: {', '.join(skipped)}")
+        
+    def _load_file_thread(self, file_path, file_name, server_name, server_group, generation, keep_raw=True):
+        with server_group.lock:
+            # Cleared since the file was queued, or queued twice
+            if server_group.generation != generation or file_path in server_group.loaded_files:
+                return
+            server_group.loaded_files.add(file_path)
+            
+        try:
+            self._load_file(file_path, file_name, server_name, server_group, generation, keep_raw)
+        except Exception:
+            # Release the path so the file can be loaded again
+            with server_group.lock:
+                if server_group.generation == generation:
+                    server_group.loaded_files.discard(file_path)
+            raise
+            
+    def _load_file(self, file_path, file_name, server_name, server_group, generation, keep_raw):
+        self.root.after(0, self.status_var.set, f"Loading {file_name} to {server_name}...")
+        
+        new_logs = []
+        
+        file_size = os.path.getsize(file_path)
+        parse_args = (file_name, server_name, keep_raw)
+        
+        if self.parse_workers > 1 and file_size >= PARALLEL_PARSE_MIN_BYTES:
+            # Parse newline-aligned byte ranges in worker processes. Records come
+            # back as columns without their raw entries, whatever keep_raw says
+            parts = max(self.parse_workers, file_size // PARALLEL_CHUNK_BYTES)
+            pool = self._get_parse_pool()
+            futures = [pool.submit(parse_file_columns, file_path, start, end, file_name, server_name)
+                       for start, end in split_file_ranges(file_path, parts)]
+            results = ((records_from_columns(columns, file_path, file_name, server_name), *rest)
+                       for columns, *rest in (future.result() for future in futures))
         else:
-            processed['timestamp'] = 'N/A'
-            processed['parsed_timestamp'] = datetime.min
-            
-        # Extract log level
-        log_level = entry.get('log.level', 'unknown')
-        processed['level'] = log_level
-        
-        # Extract component
-        component = 'unknown'
-        if 'component' in entry:
-            comp_info = entry['component']
-            if isinstance(comp_info, dict):
-                component = comp_info.get('binary', comp_info.get('type', 'unknown'))
-            else:
-                component = str(comp_info)
-        elif 'service.name' in entry:
-            component = entry['service.name']
+            results = [parse_file_range(file_path, 0, file_size, *parse_args)]
             
-        processed['component'] = component
-        
-        # Extract message
-        message = entry.get('message', '')
-        processed['message'] = message[:100] + '...' if len(message) > 100 else message
-        processed['full_message'] = message
-        
-        return processed
-        
-    def _update_ui_after_load(self, server_name, file_path, new_log_count):
-        """Update UI after file is loaded"""
-        viewer = self.server_viewers.get(server_name)
-        if viewer:
-            viewer.refresh_display()
+        # Merge ranges back in line order
+        for entries, errors in renumber_range_results(results):
+            for line_num, e in errors:
+                print(f"Error parsing line {line_num} in {file_name}: {e}")
+            new_logs.extend(entries)
+            
+        with server_group.lock:
+            # The server was cleared while this file was loading
+            if server_group.generation != generation:
+                return
+                
+            server_group.add_logs(new_logs)
+            
+    def _on_load_batch_done(self, server_names, failures):
+        """Called from a loader thread when the load queue drains"""
+        self.root.after(0, self._update_ui_after_load, server_names, failures)
+        
+    def _get_parse_pool(self):
+        """Return the shared process pool used for parallel parsing"""
+        with self._parse_pool_lock:
+            if self._parse_pool is None or self._parse_pool_workers != self.parse_workers:
+                if self._parse_pool is not None:
+                    self._parse_pool.shutdown(wait=False)
+                # Spawn rather than fork: the pool is created from a loader thread
+                self._parse_pool = ProcessPoolExecutor(
+                    max_workers=self.parse_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                self._parse_pool_workers = self.parse_workers
+            return self._parse_pool
+            
+    def set_parse_workers(self):
+        """Configure the number of processes used to parse large files"""
+        workers = simpledialog.askinteger(
+            "Parse Workers",
+            f"Number of worker processes for files over {PARALLEL_PARSE_MIN_BYTES // (1024 * 1024)} MB\n"
+            "(1 disables parallel parsing):",
+            initialvalue=self.parse_workers, minvalue=1, maxvalue=256, parent=self.root
+        )
+        if workers:
+            self.parse_workers = workers
+            self.rebuild_settings_menu()
+        
+    def _update_ui_after_load(self, server_names, failures):
+        """Update UI once after a batch of files is loaded"""
+        for server_name in sorted(server_names):
+            viewer = self.server_viewers.get(server_name)
+            if viewer:
+                viewer.refresh_display()
         self.update_status()
         
+        if failures:
+            details = "\n".join(f"{file_name}: {e}" for file_name, e in failures)
+            messagebox.showerror("Error", f"Failed to load file(s):\n{details}")
+        
     def update_status(self):
         """Update status bar with all server stats"""
         if not self.server_groups:
@@ -630,6 +2153,7 @@ class MultiServerLogViewer:
             status += " | Ready for comparison"
         elif len(self.server_groups) > 1:
             status += " | Load data to multiple servers for comparison"
+        status += f" | JSON decoder: {JSON_DECODER}"
             
         self.status_var.set(status)
         
@@ -637,6 +2161,11 @@ class MultiServerLogViewer:
         """Clear all servers"""
         for server_key in list(self.server_groups.keys()):
             self.clear_server(server_key)
+        RAW_ENTRIES.clear()
+        self.minhash_index.signatures.clear()
+        # Every server is empty, so no log still refers to a template or pair score
+        LOG_TEMPLATES.clear()
+        SIMILARITY_SCORES.clear()
         self.comparison_text.delete(1.0, tk.END)
         
     def clear_server(self, server_key):
@@ -649,17 +2178,11 @@ class MultiServerLogViewer:
         
     def on_timezone_change(self, event=None):
         """Handle timezone selection change for all servers"""
-        # Reprocess all logs to update timestamps
-        for server_key in self.server_groups:
-            for log in self.server_groups[server_key].logs:
-                if log['parsed_timestamp'] != datetime.min:
-                    local_timestamp = self.convert_timezone(log['parsed_timestamp'])
-                    tz_name = self.get_timezone_name()
-                    log['timestamp'] = local_timestamp.strftime(f'%Y-%m-%d %H:%M:%S {tz_name}')
-        
-        # Update all displays
+        # Timestamps are formatted on display, so only the shown rows need redrawing
+        DISPLAY_TIMESTAMPS.set_timezone(TIMEZONE_OFFSETS.get(self.timezone_var.get(), 0),
+                                        self.get_timezone_name())
         for server_key in self.server_viewers:
-            self.server_viewers[server_key].refresh_display()
+            self.server_viewers[server_key].refresh_timestamps()
             
     def rename_server(self, server_key):
         """Rename a server tab"""
@@ -687,20 +2210,7 @@ class MultiServerLogViewer:
         def apply_rename():
             new_name = name_var.get().strip()
             if new_name and new_name != current_name:
-                self.server_display_names[server_key] = new_name
-                
-                # Update tab text for this server
-                frame = self.server_frames.get(server_key)
-                if frame is not None:
-                    self.main_notebook.tab(frame, text=new_name)
-                
-                # Update server viewer display name
-                viewer = self.server_viewers.get(server_key)
-                if viewer:
-                    viewer.update_server_name(new_name)
-                
-                # Refresh status
-                self.update_status()
+                self.set_server_display_name(server_key, new_name)
                 
             dialog.destroy()
         
@@ -717,6 +2227,23 @@ class MultiServerLogViewer:
         entry.bind('<Return>', lambda e: apply_rename())
         dialog.bind('<Escape>', lambda e: cancel_rename())
         
+    def set_server_display_name(self, server_key, new_name):
+        """Change the display name of a server tab"""
+        self.server_display_names[server_key] = new_name
+        
+        # Update tab text for this server
+        frame = self.server_frames.get(server_key)
+        if frame is not None:
+            self.main_notebook.tab(frame, text=new_name)
+        
+        # Update server viewer display name
+        viewer = self.server_viewers.get(server_key)
+        if viewer:
+            viewer.update_server_name(new_name)
+        
+        # Refresh status
+        self.update_status()
+        
     def reset_server_names(self):
         """Reset all server names to defaults"""
         for server_key in self.server_groups.keys():
@@ -799,6 +2326,9 @@ class MultiServerLogViewer:
         
         similarity_threshold = float(self.similarity_var.get())
         found_similarities = False
+        by_template = self.by_template_var.get()
+        # Template scores compare the templates, not the messages shown below them
+        score_label = "Template similarity" if by_template else "Similarity"
         
         for i, server1 in enumerate(selected_servers):
             for server2 in selected_servers[i+1:]:
@@ -806,7 +2336,7 @@ class MultiServerLogViewer:
                 logs2 = self.server_groups[server2].logs
                 
                 similar_messages = ComparisonEngine.find_similar_messages(
-                    logs1, logs2, similarity_threshold, time_window
+                    logs1, logs2, similarity_threshold, time_window, by_template
                 )
                 
                 if similar_messages:
@@ -817,9 +2347,9 @@ class MultiServerLogViewer:
                     
                     for correlation in similar_messages[:3]:  # Top 3 per pair
                         log1, log2 = correlation['log1'], correlation['log2']
-                        self.comparison_text.insert(tk.END, f"  Similarity: {correlation['similarity']:.2f} | Time diff: {correlation['time_diff_minutes']:.1f} min\n")
-                        self.comparison_text.insert(tk.END, f"    {name1}: {log1['full_message'][:80]}...\n")
-                        self.comparison_text.insert(tk.END, f"    {name2}: {log2['full_message'][:80]}...\n\n")
+                        self.comparison_text.insert(tk.END, f"  {score_label}: {correlation['similarity']:.2f} | Time diff: {correlation['time_diff_minutes']:.1f} min\n")
+                        self.comparison_text.insert(tk.END, f"    {name1}: {log1.full_message[:80]}...\n")
+                        self.comparison_text.insert(tk.END, f"    {name2}: {log2.full_message[:80]}...\n\n")
         
         if not found_similarities:
             self.comparison_text.insert(tk.END, "No similar messages found above threshold.\n")
@@ -889,6 +2419,9 @@ class MultiServerLogViewer:
         selected_servers = self.get_selected_servers()
         similarity_threshold = float(self.similarity_var.get())
         time_window = float(self.time_window_var.get())
+        by_template = self.by_template_var.get()
+        # Template scores compare the templates, not the messages shown below them
+        score_label = "Template similarity" if by_template else "Similarity"
         
         total_pairs = 0
         total_found = 0
@@ -900,7 +2433,7 @@ class MultiServerLogViewer:
                 logs2 = self.server_groups[server2].logs
                 
                 similar_messages = ComparisonEngine.find_similar_messages(
-                    logs1, logs2, similarity_threshold, time_window
+                    logs1, logs2, similarity_threshold, time_window, by_template
                 )
                 
                 name1 = self.server_display_names[server1]
@@ -912,11 +2445,11 @@ class MultiServerLogViewer:
                     
                     for j, correlation in enumerate(similar_messages[:5], 1):
                         log1, log2 = correlation['log1'], correlation['log2']
-                        self.comparison_text.insert(tk.END, f"{j}. Similarity: {correlation['similarity']:.3f} | Time diff: {correlation['time_diff_minutes']:.1f} min\n")
-                        self.comparison_text.insert(tk.END, f"   {name1} [{log1['component']}] {log1['timestamp']}\n")
-                        self.comparison_text.insert(tk.END, f"   {log1['full_message']}\n")
-                        self.comparison_text.insert(tk.END, f"   {name2} [{log2['component']}] {log2['timestamp']}\n")
-                        self.comparison_text.insert(tk.END, f"   {log2['full_message']}\n")
+                        self.comparison_text.insert(tk.END, f"{j}. {score_label}: {correlation['similarity']:.3f} | Time diff: {correlation['time_diff_minutes']:.1f} min\n")
+                        self.comparison_text.insert(tk.END, f"   {name1} [{log1.component}] {log1.timestamp}\n")
+                        self.comparison_text.insert(tk.END, f"   {log1.full_message}\n")
+                        self.comparison_text.insert(tk.END, f"   {name2} [{log2.component}] {log2.timestamp}\n")
+                        self.comparison_text.insert(tk.END, f"   {log2.full_message}\n")
                         self.comparison_text.insert(tk.END, "-"*60 + "\n\n")
                 else:
                     self.comparison_text.insert(tk.END, f"{name1} vs {name2}: No similar messages above threshold {similarity_threshold}.\n\n")
@@ -927,6 +2460,44 @@ class MultiServerLogViewer:
         
         self.main_notebook.select(self.comparison_frame)
         
+    def run_fleet_similarity(self):
+        """Group similar error/warning messages across all selected servers at once"""
+        if not self.validate_comparison():
+            return
+            
+        self.comparison_text.delete(1.0, tk.END)
+        self.comparison_text.insert(tk.END, "FLEET MESSAGE SIMILARITY\n")
+        self.comparison_text.insert(tk.END, "="*35 + "\n\n")
+        
+        selected_servers = self.get_selected_servers()
+        similarity_threshold = float(self.similarity_var.get())
+        
+        server_logs = {sk: self.server_groups[sk].rows_with_levels(lambda level: level.lower() in ['error', 'warn', 'warning'])
+                       for sk in selected_servers}
+        clusters = ComparisonEngine.find_fleet_clusters(server_logs, similarity_threshold, self.minhash_index)
+        
+        names = ', '.join(self.server_display_names[sk] for sk in selected_servers)
+        self.comparison_text.insert(tk.END, f"Servers: {names}\n")
+        self.comparison_text.insert(tk.END, f"Similarity threshold: {similarity_threshold} (time window not applied)\n\n")
+        
+        if not clusters:
+            self.comparison_text.insert(tk.END, "No similar error/warning messages found on more than one server.\n")
+        else:
+            self.comparison_text.insert(tk.END, f"Found {len(clusters)} message groups seen on more than one server:\n\n")
+            for j, cluster in enumerate(clusters[:20], 1):
+                servers = cluster['servers']
+                self.comparison_text.insert(tk.END, f"{j}. [{cluster['count']}x on {len(servers)} servers] {cluster['messages'][0][:120]}\n")
+                counts = ', '.join(f"{self.server_display_names[sk]}: {servers[sk]}" for sk in selected_servers if sk in servers)
+                self.comparison_text.insert(tk.END, f"   {counts}\n")
+                variants = cluster['messages'][1:]
+                if variants:
+                    self.comparison_text.insert(tk.END, f"   {len(variants)} similar variants, e.g.:\n")
+                    for message in variants[:3]:
+                        self.comparison_text.insert(tk.END, f"     {message[:120]}\n")
+                self.comparison_text.insert(tk.END, "\n")
+                
+        self.main_notebook.select(self.comparison_frame)
+        
     def run_component_comparison(self):
         """Compare component activity across selected servers"""
         if not self.validate_comparison():
@@ -942,6 +2513,20 @@ class MultiServerLogViewer:
         all_components = set()
         for sk in selected_servers:
             all_components.update(self.server_groups[sk].components)
+            
+        # Per-server (component, level) and (component, template) counts, grouped once
+        # from the columnar store
+        component_counts = {}
+        component_templates = {}
+        for sk in selected_servers:
+            counts = defaultdict(Counter)
+            for (component, level), count in self.server_groups[sk].component_level_counts().items():
+                counts[component][level.lower()] += count
+            component_counts[sk] = counts
+            templates = defaultdict(Counter)
+            for (component, template_id), count in self.server_groups[sk].component_template_counts().items():
+                templates[component][template_id] = count
+            component_templates[sk] = templates
         
         for component in sorted(all_components):
             self.comparison_text.insert(tk.END, f"Component: {component}\n")
@@ -951,14 +2536,14 @@ class MultiServerLogViewer:
             warnings = []
             
             for sk in selected_servers:
-                sg = self.server_groups[sk]
                 name = self.server_display_names[sk]
-                comp_logs = [log for log in sg.logs if log['component'] == component]
-                error_count = sum(1 for log in comp_logs if log['level'].lower() == 'error')
-                warn_count = sum(1 for log in comp_logs if log['level'].lower() in ['warn', 'warning'])
+                comp_counts = component_counts[sk][component]
+                total_count = sum(comp_counts.values())
+                error_count = comp_counts['error']
+                warn_count = comp_counts['warn'] + comp_counts['warning']
                 
-                self.comparison_text.insert(tk.END, f"  {name}: {len(comp_logs)} logs, {error_count} errors, {warn_count} warnings\n")
-                counts.append(len(comp_logs))
+                self.comparison_text.insert(tk.END, f"  {name}: {total_count} logs, {error_count} errors, {warn_count} warnings\n")
+                counts.append(total_count)
                 errors.append(error_count)
                 warnings.append(warn_count)
             
@@ -975,6 +2560,21 @@ class MultiServerLogViewer:
                 only_server = self.server_display_names[selected_servers[only_idx]]
                 self.comparison_text.insert(tk.END, f"  ⚠️  Component only active on {only_server}\n")
                 
+            # Message templates logged by some of the servers but not all of them
+            template_totals = Counter()
+            template_servers = defaultdict(list)
+            for sk in selected_servers:
+                for template_id, count in component_templates[sk][component].items():
+                    template_totals[template_id] += count
+                    template_servers[template_id].append(self.server_display_names[sk])
+            partial = [(template_id, count) for template_id, count in template_totals.most_common()
+                       if len(template_servers[template_id]) < len(selected_servers)]
+            if partial and active_servers > 1:
+                self.comparison_text.insert(tk.END, f"  ⚠️  {len(partial)} message templates not seen on every server\n")
+                for template_id, count in partial[:3]:
+                    names = ', '.join(template_servers[template_id])
+                    self.comparison_text.insert(tk.END, f"    Only on {names}: [{count}x] {LOG_TEMPLATES.template(template_id)[:80]}\n")
+                
             self.comparison_text.insert(tk.END, "\n")
             
         self.main_notebook.select(self.comparison_frame)
@@ -1015,39 +2615,15 @@ class MultiServerLogViewer:
                 
     def convert_timezone(self, utc_timestamp):
         """Convert UTC timestamp to selected timezone"""
-        tz_map = {
-            "UTC": 0,
-            "Eastern (EDT)": -4,  # UTC-4
-            "Eastern (EST)": -5,  # UTC-5
-            "Central (CDT)": -5,  # UTC-5
-            "Central (CST)": -6,  # UTC-6
-            "Mountain (MDT)": -6, # UTC-6
-            "Mountain (MST)": -7, # UTC-7
-            "Pacific (PDT)": -7,  # UTC-7
-            "Pacific (PST)": -8   # UTC-8
-        }
-        
         selected_tz = self.timezone_var.get()
-        offset_hours = tz_map.get(selected_tz, 0)
+        offset_hours = TIMEZONE_OFFSETS.get(selected_tz, 0)
         
         return utc_timestamp + timedelta(hours=offset_hours)
     
     def get_timezone_name(self):
         """Get timezone abbreviation for display"""
-        tz_names = {
-            "UTC": "UTC",
-            "Eastern (EDT)": "EDT", 
-            "Eastern (EST)": "EST",
-            "Central (CDT)": "CDT",
-            "Central (CST)": "CST", 
-            "Mountain (MDT)": "MDT",
-            "Mountain (MST)": "MST",
-            "Pacific (PDT)": "PDT",
-            "Pacific (PST)": "PST"
-        }
-        
         selected_tz = self.timezone_var.get()
-        return tz_names.get(selected_tz, "UTC")
+        return TIMEZONE_NAMES.get(selected_tz, "UTC")
     
 
 class ServerViewer:
@@ -1060,6 +2636,20 @@ class ServerViewer:
         self.server_group = main_app.server_groups[server_name]
         self.filtered_logs = []
         
+        # Filtering runs on a background thread; results from runs superseded
+        # by a newer apply_filters (a higher generation) are dropped
+        self.filter_generation = 0
+        self.filtering = False
+        self._filter_after_id = None
+        # Recent results as (group version, filter spec) -> matching rows
+        self.filter_cache = LRUCache(FILTER_CACHE_SIZE)
+        
+        # The log table only materializes the visible window of filtered_logs
+        self.view_start = 0
+        self.selected_index = None
+        self._row_height = None
+        self._header_height = None
+        
         self.setup_widgets()
         
     def update_server_name(self, new_name):
@@ -1077,6 +2667,8 @@ class ServerViewer:
                   command=lambda: self.main_app.load_file(self.server_key)).pack(side=tk.LEFT, padx=5)
         ttk.Button(toolbar, text="Add Files", 
                   command=lambda: self.main_app.add_file(self.server_key)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(toolbar, text="Add Directory", 
+                  command=lambda: self.main_app.add_directory(self.server_key)).pack(side=tk.LEFT, padx=5)
         ttk.Button(toolbar, text="Clear", 
                   command=lambda: self.main_app.clear_server(self.server_key)).pack(side=tk.LEFT, padx=5)
         
@@ -1130,6 +2722,22 @@ class ServerViewer:
         search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=15)
         search_entry.pack(side=tk.LEFT, padx=5)
         search_entry.bind('<Return>', lambda e: self.apply_filters())
+        # Only edits re-run the filters; cursor keys and shortcuts leave the view as it is
+        self.search_var.trace_add('write', self.schedule_filters)
+        self.regex_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(search_frame, text="Regex", variable=self.regex_var).pack(side=tk.LEFT)
+        
+        # Query bar
+        query_frame = ttk.Frame(self.parent)
+        query_frame.pack(fill=tk.X, padx=5)
+        ttk.Label(query_frame, text="Query:").pack(side=tk.LEFT)
+        self.query_var = tk.StringVar()
+        query_entry = ttk.Entry(query_frame, textvariable=self.query_var)
+        query_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        query_entry.bind('<Return>', lambda e: self.apply_filters())
+        self.query_var.trace_add('write', self.schedule_filters)
+        ttk.Label(query_frame, text='e.g. level:error component:filebeat message:"connection refused" '
+                  '@timestamp>2024-01-15T10:00').pack(side=tk.LEFT, padx=5)
         
         # Filter buttons
         button_frame = ttk.Frame(filter_frame)
@@ -1186,15 +2794,22 @@ class ServerViewer:
         self.tree.column('file', width=100)
         self.tree.column('message', width=300)
         
-        # Scrollbars
-        v_scrollbar = ttk.Scrollbar(left_panel, orient=tk.VERTICAL, command=self.tree.yview)
+        # Scrollbars - the vertical one scrolls through filtered_logs, not the tree items
+        self.v_scrollbar = ttk.Scrollbar(left_panel, orient=tk.VERTICAL, command=self.on_table_scroll)
         h_scrollbar = ttk.Scrollbar(left_panel, orient=tk.HORIZONTAL, command=self.tree.xview)
-        self.tree.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
+        self.tree.configure(xscrollcommand=h_scrollbar.set)
         
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.v_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         h_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
         
+        self.tree.bind('<Configure>', lambda e: self.render_visible_rows())
+        self.tree.bind('<MouseWheel>', self.on_table_wheel)
+        self.tree.bind('<Button-4>', self.on_table_wheel)
+        self.tree.bind('<Button-5>', self.on_table_wheel)
+        for key in ('<Up>', '<Down>', '<Prior>', '<Next>', '<Home>', '<End>'):
+            self.tree.bind(key, self.on_table_key)
+        
         # Right panel - Details
         right_panel = ttk.Frame(paned_window)
         
@@ -1241,7 +2856,7 @@ class ServerViewer:
         # Update filter dropdowns
         self.component_combo['values'] = ['All'] + sorted(list(self.server_group.components))
         self.level_combo['values'] = ['All'] + sorted(list(self.server_group.log_levels))
-        self.file_combo['values'] = ['All'] + sorted(list(self.server_group.loaded_files))
+        self.file_combo['values'] = ['All'] + sorted(self.server_group.file_table.values)
         
         # Reset filters if not set
         if not self.component_var.get():
@@ -1253,70 +2868,204 @@ class ServerViewer:
             
         self.apply_filters()
         
-    def apply_filters(self):
-        """Apply all filters to log display"""
-        self.filtered_logs = []
-        
+    def schedule_filters(self, *args):
+        """Re-apply filters once edits to the search or query text pause"""
+        root = self.main_app.root
+        if self._filter_after_id is not None:
+            root.after_cancel(self._filter_after_id)
+        self._filter_after_id = root.after(FILTER_DEBOUNCE_MS, self.apply_filters, False)
+        
+    def apply_filters(self, show_errors=True):
+        """Apply all filters to log display.
+        
+        The filter values are read here; matching runs on a background thread
+        and streams results back through _on_filter_chunk.
+        """
+        if self._filter_after_id is not None:
+            self.main_app.root.after_cancel(self._filter_after_id)
+            self._filter_after_id = None
+            
+        use_regex = self.regex_var.get()
+        search_regex = None
+        if use_regex and self.search_var.get():
+            try:
+                search_regex = re.compile(self.search_var.get(), re.IGNORECASE)
+            except re.error as e:
+                # A half-typed pattern is expected while the search is debounced
+                if show_errors:
+                    messagebox.showerror("Error", f"Invalid search pattern: {e}")
+                return
+                
+        try:
+            query = parse_query(self.query_var.get(), DISPLAY_TIMESTAMPS.offset)
+        except ValueError as e:
+            if show_errors:
+                messagebox.showerror("Error", f"Invalid query: {e}")
+            return
+            
         # Get filter values
         component_filter = self.component_var.get()
         level_filter = self.level_var.get()
         file_filter = self.file_var.get()
         search_term = self.search_var.get().lower()
-        start_time_str = self.start_time.get()
-        end_time_str = self.end_time.get()
-        
-        # Parse time filters
-        start_time = None
-        end_time = None
         
-        if start_time_str:
-            try:
-                start_time = datetime.fromisoformat(start_time_str.replace('Z', '+00:00'))
-            except:
-                try:
-                    start_time = datetime.strptime(start_time_str, '%Y-%m-%d %H:%M:%S')
-                except:
-                    pass
-                    
-        if end_time_str:
-            try:
-                end_time = datetime.fromisoformat(end_time_str.replace('Z', '+00:00'))
-            except:
-                try:
-                    end_time = datetime.strptime(end_time_str, '%Y-%m-%d %H:%M:%S')
-                except:
-                    pass
+        # Parse time filters; like query times, they are in the display timezone
+        offset = DISPLAY_TIMESTAMPS.offset
+        start_time = parse_filter_time(self.start_time.get(), offset) if self.start_time.get() else None
+        end_time = parse_filter_time(self.end_time.get(), offset) if self.end_time.get() else None
+        
+        # Logs are time-ordered, so the time range is a slice of rows
+        start_ns = datetime_to_ns(start_time, clamp=True) if start_time else None
+        end_ns = datetime_to_ns(end_time, clamp=True) if end_time else None
+        
+        # Query bounds tighten the time range; query fields take precedence over the dropdowns
+        if query['start_ns'] is not None:
+            start_ns = query['start_ns'] if start_ns is None else max(start_ns, query['start_ns'])
+        if query['end_ns'] is not None:
+            end_ns = query['end_ns'] if end_ns is None else min(end_ns, query['end_ns'])
+        # Intern tables only grow while loading, so they are read without the group lock
+        fields = [
+            (query['component'], component_filter, self.server_group.component_table),
+            (query['level'], level_filter, self.server_group.level_table),
+            (query['file_name'], file_filter, self.server_group.file_table),
+        ]
+        values = [resolve_field_value(table, query_value) if query_value is not None
+                  else None if filter_value == 'All' else filter_value
+                  for query_value, filter_value, table in fields]
+        search_terms = query['search_terms']
+        if search_term and not search_regex:
+            search_terms = (search_term,) + search_terms
+            
+        spec = (start_ns, end_ns, *values, search_terms,
+                search_regex.pattern if search_regex else None, query['message_terms'])
+        
+        self.filter_generation += 1
+        self.filtering = True
+        self.update_filter_status()
+        threading.Thread(
+            target=self._filter_thread,
+            args=(self.filter_generation, spec, search_regex),
+            daemon=True
+        ).start()
+        
+    def _filter_thread(self, generation, spec, search_regex):
+        try:
+            self._run_filter(generation, spec, search_regex)
+        except Exception as e:
+            # Without this the viewer would show "filtering..." until the next run
+            self.main_app.root.after(0, self._on_filter_error, generation, e)
+            
+    def _run_filter(self, generation, spec, search_regex):
+        start_ns, end_ns, component_filter, level_filter, file_filter, search_terms, _, message_terms = spec
+        group = self.server_group
+        if search_terms or message_terms or search_regex:
+            group.index_new_logs()
+            if generation != self.filter_generation:
+                return
+        with group.lock:
+            version = group.version
+            rows = self.filter_cache.get((version, spec))
+            if rows is not None:
+                search_terms = message_terms = ()
+                search_regex = None
+            else:
+                # Narrowing a cached result only needs to re-check that result, and
+                # only for the search terms it doesn't already guarantee
+                candidates = None
+                base = None
+                for (cached_version, cached_spec), cached_rows in self.filter_cache.items():
+                    if (cached_version == version and filter_narrows(spec, cached_spec)
+                            and (candidates is None or len(cached_rows) < len(candidates))):
+                        candidates = cached_rows
+                        base = cached_spec
+                if base is not None:
+                    search_terms = tuple(term for term in search_terms
+                                         if not any(term in known for known in base[5] + base[7]))
+                    message_terms = tuple(term for term in message_terms
+                                          if not any(term in known for known in base[7]))
+                    if base[6] is not None:
+                        search_regex = None
+                        
+                # Narrow by each term through the token index; only exact index hits
+                # skip the per-record check
+                lookups = [(term, False, True) for term in search_terms]
+                lookups += [(term, False, False) for term in message_terms]
+                if search_regex:
+                    lookups.append((search_regex.pattern, True, False))
+                for term, regex, may_be_exact in lookups:
+                    term_rows, exact = group.search_rows(term, regex=regex)
+                    if term_rows is None:
+                        continue
+                    if exact and may_be_exact:
+                        search_terms = tuple(t for t in search_terms if t != term)
+                    candidates = term_rows if candidates is None else intersect_rows(candidates, term_rows)
+                rows = group.select_rows(start_ns, end_ns, component=component_filter,
+                                         level=level_filter, file_name=file_filter, rows=candidates)
+            logs = group.logs
+            if isinstance(rows, range):
+                logs = logs[rows.start:rows.stop]
+            else:
+                logs = [logs[row] for row in rows]
         
-        # Apply all filters
-        for log in self.server_group.logs:
-            # Component filter
-            if component_filter != 'All' and log['component'] != component_filter:
-                continue
-            
-            # Level filter
-            if level_filter != 'All' and log['level'] != level_filter:
-                continue
-            
-            # File filter
-            if file_filter != 'All' and log.get('file_name', '') != file_filter:
-                continue
-                
-            # Time range filter
-            if start_time and log['parsed_timestamp'] < start_time:
-                continue
-            if end_time and log['parsed_timestamp'] > end_time:
-                continue
-                
-            # Search filter
-            if search_term:
-                searchable_text = (log['full_message'] + ' ' + 
-                                 json.dumps(log['raw'])).lower()
-                if search_term not in searchable_text:
-                    continue
-            
-            self.filtered_logs.append(log)
+        if not (search_terms or message_terms or search_regex):
+            if not isinstance(rows, range):
+                # Plain time slices are cheap to recompute and not worth caching
+                self.filter_cache.put((version, spec), array('I', rows))
+            self.main_app.root.after(0, self._on_filter_chunk, generation, logs, True, True)
+            return
             
-        self.update_tree_view()
+        def matches(log):
+            if search_terms or search_regex:
+                text = record_search_text(log)
+                if not all(term in text for term in search_terms):
+                    return False
+                if search_regex and not search_regex.search(text):
+                    return False
+            if message_terms:
+                message = str(log.full_message).lower()
+                return all(term in message for term in message_terms)
+            return True
+            
+        # Search filter, checked in chunks so a newer run can cut this one short
+        matched_rows = array('I')
+        pending = zip(rows, logs)
+        for start in range(0, len(logs), FILTER_CHUNK_SIZE):
+            if generation != self.filter_generation:
+                return
+            matched = []
+            for row, log in islice(pending, FILTER_CHUNK_SIZE):
+                if matches(log):
+                    matched.append(log)
+                    matched_rows.append(row)
+            done = start + FILTER_CHUNK_SIZE >= len(logs)
+            if done:
+                self.filter_cache.put((version, spec), matched_rows)
+            if matched or start == 0 or done:
+                self.main_app.root.after(0, self._on_filter_chunk, generation, matched, start == 0, done)
+        if not logs:
+            self.main_app.root.after(0, self._on_filter_chunk, generation, [], True, True)
+            
+    def _on_filter_chunk(self, generation, logs, first, done):
+        """Show a chunk of filter results on the main thread"""
+        if generation != self.filter_generation:
+            return
+        if done:
+            self.filtering = False
+        if first:
+            self.filtered_logs = logs
+            self.update_tree_view()
+        else:
+            self.filtered_logs.extend(logs)
+            self.render_visible_rows()
+            self.update_filter_status()
+        
+    def _on_filter_error(self, generation, error):
+        """Report a failed filter run on the main thread"""
+        if generation != self.filter_generation:
+            return
+        self.filtering = False
+        self.update_filter_status()
+        self.stats_var.set(f"{self.stats_var.get()} - filter failed: {error}")
         
     def clear_filters(self):
         """Clear all filters"""
@@ -1326,57 +3075,164 @@ class ServerViewer:
         self.start_time.set('')
         self.end_time.set('')
         self.search_var.set('')
+        self.query_var.set('')
         self.apply_filters()
         
     def update_tree_view(self):
         """Update tree view with filtered logs"""
-        # Clear existing
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-            
-        # Add filtered logs
-        for log in self.filtered_logs:
-            self.tree.insert('', tk.END, values=(
-                log['timestamp'],
-                log['level'],
-                log['component'],
-                log.get('file_name', 'unknown'),
-                log['message']
-            ), tags=(log['line_number'], log.get('file_name', 'unknown')))
-            
-        # Update status if exists
+        # Only the visible window is rendered, so this is independent of the result size
+        self.view_start = 0
+        self.selected_index = None
+        self.render_visible_rows()
+        self.update_filter_status()
+        
+    def refresh_timestamps(self):
+        """Redraw the shown rows and details after a timezone change"""
+        # Time Range and query times are read in the display timezone
+        if (self.start_time.get() or self.end_time.get()
+                or 'timestamp' in self.query_var.get().lower()):
+            self.apply_filters(show_errors=False)
+        self.render_visible_rows()
+        if self.selected_index is not None:
+            self.show_log_details(self.filtered_logs[self.selected_index])
+            
+    def update_filter_status(self):
+        """Show the filtered log count in the stats line"""
         if hasattr(self, 'stats_var'):
             total = len(self.server_group.logs)
             filtered = len(self.filtered_logs)
             stats = self.server_group.get_stats()
-            self.stats_var.set(f"{self.server_name}: Showing {filtered} of {total} logs ({stats['files']} files, {stats['errors']} errors)")
-            
+            progress = " - filtering..." if self.filtering else ""
+            self.stats_var.set(f"{self.server_name}: Showing {filtered} of {total} logs ({stats['files']} files, {stats['errors']} errors){progress}")
+            
+    def visible_row_count(self):
+        """Number of table rows that fit in the tree widget"""
+        row_height = self._row_height or DEFAULT_ROW_HEIGHT
+        header_height = self._header_height or DEFAULT_HEADER_HEIGHT
+        return max(1, (self.tree.winfo_height() - header_height) // row_height)
+        
+    def render_visible_rows(self):
+        """Materialize the rows of filtered_logs in the current scroll window"""
+        total = len(self.filtered_logs)
+        count = self.visible_row_count()
+        self.view_start = max(0, min(self.view_start, total - count))
+        
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+            
+        # Item ids are indexes into filtered_logs
+        end = min(total, self.view_start + count)
+        for index in range(self.view_start, end):
+            log = self.filtered_logs[index]
+            self.tree.insert('', tk.END, iid=str(index), values=(
+                log.timestamp,
+                log.level,
+                log.component,
+                log.file_name,
+                log.message
+            ))
+            
+        if self.selected_index is not None and self.view_start <= self.selected_index < end:
+            self.tree.selection_set(str(self.selected_index))
+            
+        # Measure the real row geometry once a row exists
+        if self._row_height is None and end > self.view_start:
+            bbox = self.tree.bbox(str(self.view_start))
+            if bbox:
+                self._header_height, self._row_height = bbox[1], bbox[3]
+                
+        if total:
+            self.v_scrollbar.set(self.view_start / total, end / total)
+        else:
+            self.v_scrollbar.set(0, 1)
+            
+    def scroll_table_to(self, start):
+        """Scroll the log table so that filtered_logs[start] is the first visible row"""
+        start = max(0, min(start, len(self.filtered_logs) - self.visible_row_count()))
+        if start != self.view_start:
+            self.view_start = start
+            self.render_visible_rows()
+            
+    def on_table_scroll(self, *args):
+        """Handle the vertical scrollbar (same protocol as Tk yview)"""
+        if args[0] == 'moveto':
+            self.scroll_table_to(int(float(args[1]) * len(self.filtered_logs)))
+        elif args[0] == 'scroll':
+            step = self.visible_row_count() if args[2] == 'pages' else 1
+            self.scroll_table_to(self.view_start + int(args[1]) * step)
+            
+    def on_table_wheel(self, event):
+        """Scroll the log table with the mouse wheel"""
+        if event.num == 4 or event.delta > 0:
+            self.scroll_table_to(self.view_start - WHEEL_SCROLL_ROWS)
+        else:
+            self.scroll_table_to(self.view_start + WHEEL_SCROLL_ROWS)
+        return 'break'
+        
     def on_log_select(self, event):
         """Handle log selection"""
         selection = self.tree.selection()
         if not selection:
             return
             
-        item = selection[0]
-        tags = self.tree.item(item, 'tags')
-        line_number = int(tags[0])
-        file_name = tags[1] if len(tags) > 1 else 'unknown'
-        
-        # Find the log entry
-        selected_log = None
-        for log in self.server_group.logs:
-            if log['line_number'] == line_number and log.get('file_name', 'unknown') == file_name:
-                selected_log = log
-                break
-                
-        if selected_log:
-            self.show_log_details(selected_log)
+        # Item ids are indexes into filtered_logs
+        index = int(selection[0])
+        # Re-selecting the same row after scrolling does not need a refresh
+        if index == self.selected_index:
+            return
+        self.selected_index = index
+        self.show_log_details(self.filtered_logs[index])
+        
+    def select_row(self, index):
+        """Select filtered_logs[index], scrolling it into view"""
+        count = self.visible_row_count()
+        if index < self.view_start:
+            self.view_start = index
+        elif index >= self.view_start + count:
+            self.view_start = index - count + 1
+            
+        self.selected_index = index
+        self.render_visible_rows()
+        self.tree.focus(str(index))
+        self.show_log_details(self.filtered_logs[index])
+        
+    def on_table_key(self, event):
+        """Move the selection through all of filtered_logs, not just the visible rows"""
+        total = len(self.filtered_logs)
+        if not total:
+            return 'break'
+            
+        page = self.visible_row_count()
+        current = self.selected_index
+        if event.keysym == 'Home':
+            target = 0
+        elif event.keysym == 'End':
+            target = total - 1
+        elif current is None:
+            # The first key press selects the top visible row
+            target = self.view_start
+        else:
+            target = current + {'Up': -1, 'Down': 1, 'Prior': -page, 'Next': page}[event.keysym]
+            
+        self.select_row(max(0, min(target, total - 1)))
+        return 'break'
             
     def show_log_details(self, log_entry):
         """Show details of selected log entry in all tabs"""
+        try:
+            raw = log_entry.raw
+        except (OSError, ValueError) as e:
+            # Raw JSON not kept in memory and its source file moved, deleted or changed
+            unavailable = f"Source file unavailable: {log_entry.source}\n{e}"
+            for text in (self.raw_text, self.formatted_text, self.metrics_text):
+                text.delete(1.0, tk.END)
+                text.insert(1.0, unavailable)
+            return
+            
         # Raw JSON
         self.raw_text.delete(1.0, tk.END)
-        self.raw_text.insert(1.0, json.dumps(log_entry['raw'], indent=2))
+        self.raw_text.insert(1.0, json.dumps(raw, indent=2))
         
         # Formatted view
         self.formatted_text.delete(1.0, tk.END)
@@ -1385,23 +3241,28 @@ class ServerViewer:
         
         # Metrics (if present)
         self.metrics_text.delete(1.0, tk.END)
-        if 'monitoring' in log_entry['raw']:
-            metrics = self.extract_metrics(log_entry['raw']['monitoring'])
+        if 'monitoring' in raw:
+            metrics = self.extract_metrics(raw['monitoring'])
             self.metrics_text.insert(1.0, metrics)
         else:
             self.metrics_text.insert(1.0, "No metrics data in this log entry")
             
     def format_log_entry(self, log_entry):
         """Format log entry for human reading"""
-        raw = log_entry['raw']
+        raw = log_entry.raw
         lines = []
         
-        lines.append(f"Timestamp: {log_entry['timestamp']}")
-        lines.append(f"Log Level: {log_entry['level']}")
-        lines.append(f"Component: {log_entry['component']}")
-        lines.append(f"Server: {log_entry['server_name']}")
-        lines.append(f"File: {log_entry.get('file_name', 'unknown')}")
-        lines.append(f"Message: {log_entry['full_message']}")
+        lines.append(f"Timestamp: {log_entry.timestamp}")
+        lines.append(f"Log Level: {log_entry.level}")
+        lines.append(f"Component: {log_entry.component}")
+        lines.append(f"Server: {log_entry.server_name}")
+        lines.append(f"File: {log_entry.file_name}")
+        lines.append(f"Message: {log_entry.full_message}")
+        if log_entry.template_id is not None:
+            lines.append(f"Template: {log_entry.template}")
+            parameters = log_entry.parameters
+            if parameters:
+                lines.append(f"Parameters: {', '.join(parameters)}")
         lines.append("")
         
         # Add other relevant fields
@@ -1477,24 +3338,18 @@ class ServerViewer:
         self.analysis_text.insert(tk.END, f"{self.server_name.upper()} TIMELINE ANALYSIS\n")
         self.analysis_text.insert(tk.END, "="*50 + "\n\n")
         
-        # Group logs by component and timestamp
-        component_timeline = defaultdict(list)
-        all_timestamps = []
-        
-        for log in self.server_group.logs:
-            if log['parsed_timestamp'] != datetime.min:
-                component_timeline[log['component']].append(log['parsed_timestamp'])
-                all_timestamps.append(log['parsed_timestamp'])
+        # The timestamp column is already sorted; logs without a timestamp come first
+        with self.server_group.lock:
+            all_timestamps = self.server_group.ts_ns[self.server_group.first_timed_row():]
+        component_timeline = self.server_group.component_time_bounds()
         
         if not all_timestamps:
             self.analysis_text.insert(tk.END, "No valid timestamps found for analysis.\n")
             return
             
-        all_timestamps.sort()
-        
         # Overall timeline stats
-        start_time = all_timestamps[0]
-        end_time = all_timestamps[-1]
+        start_time = ns_to_datetime(all_timestamps[0])
+        end_time = ns_to_datetime(all_timestamps[-1])
         duration = end_time - start_time
         
         self.analysis_text.insert(tk.END, f"Timeline Overview:\n")
@@ -1506,14 +3361,16 @@ class ServerViewer:
         # Find gaps in logging (periods longer than 2 minutes with no logs)
         self.analysis_text.insert(tk.END, "Logging Gaps (> 2 minutes):\n")
         gaps_found = False
-        for i in range(1, len(all_timestamps)):
-            gap = all_timestamps[i] - all_timestamps[i-1]
-            if gap > timedelta(minutes=2):
-                gaps_found = True
-                gap_start = self.main_app.convert_timezone(all_timestamps[i-1])
-                gap_end = self.main_app.convert_timezone(all_timestamps[i])
-                tz_name = self.main_app.get_timezone_name()
-                self.analysis_text.insert(tk.END, f"  Gap: {gap_start.strftime('%Y-%m-%d %H:%M:%S')} to {gap_end.strftime('%Y-%m-%d %H:%M:%S')} {tz_name} (Duration: {gap})\n")
+        gap_ns = 2 * 60 * 10**9
+        gap_rows = [i for i, (prev, curr) in enumerate(zip(all_timestamps, islice(all_timestamps, 1, None)), 1)
+                    if curr - prev > gap_ns]
+        for i in gap_rows:
+            gaps_found = True
+            gap = ns_to_datetime(all_timestamps[i]) - ns_to_datetime(all_timestamps[i-1])
+            gap_start = self.main_app.convert_timezone(ns_to_datetime(all_timestamps[i-1]))
+            gap_end = self.main_app.convert_timezone(ns_to_datetime(all_timestamps[i]))
+            tz_name = self.main_app.get_timezone_name()
+            self.analysis_text.insert(tk.END, f"  Gap: {gap_start.strftime('%Y-%m-%d %H:%M:%S')} to {gap_end.strftime('%Y-%m-%d %H:%M:%S')} {tz_name} (Duration: {gap})\n")
         
         if not gaps_found:
             self.analysis_text.insert(tk.END, "  No significant gaps found.\n")
@@ -1523,11 +3380,10 @@ class ServerViewer:
         # Component activity periods
         self.analysis_text.insert(tk.END, "Component Activity:\n")
         for component in sorted(component_timeline.keys()):
-            timestamps = sorted(component_timeline[component])
-            if timestamps:
-                comp_start = self.main_app.convert_timezone(timestamps[0])
-                comp_end = self.main_app.convert_timezone(timestamps[-1])
-                comp_count = len(timestamps)
+            first_ns, last_ns, comp_count = component_timeline[component]
+            if comp_count:
+                comp_start = self.main_app.convert_timezone(ns_to_datetime(first_ns))
+                comp_end = self.main_app.convert_timezone(ns_to_datetime(last_ns))
                 tz_name = self.main_app.get_timezone_name()
                 self.analysis_text.insert(tk.END, f"  {component}:\n")
                 self.analysis_text.insert(tk.END, f"    First: {comp_start.strftime('%Y-%m-%d %H:%M:%S')} {tz_name}\n")
@@ -1544,24 +3400,23 @@ class ServerViewer:
         self.analysis_text.insert(tk.END, f"{self.server_name.upper()} ERROR ANALYSIS\n")
         self.analysis_text.insert(tk.END, "="*50 + "\n\n")
         
-        # Count errors by level and component
+        # Count errors by level and component from the columnar store
         error_levels = Counter()
         error_by_component = defaultdict(Counter)
         error_messages = Counter()
         error_timeline = []
         
-        for log in self.server_group.logs:
-            level = log['level'].lower()
-            component = log['component']
-            message = log['full_message'][:100]  # First 100 chars
+        for level, count in self.server_group.level_counts().items():
+            error_levels[level.lower()] += count
+        for (component, level), count in self.server_group.component_level_counts().items():
+            error_by_component[component][level.lower()] += count
             
-            error_levels[level] += 1
-            error_by_component[component][level] += 1
-            
-            if level in ['error', 'warn', 'warning']:
-                error_messages[message] += 1
-                if log['parsed_timestamp'] != datetime.min:
-                    error_timeline.append((log['parsed_timestamp'], level, component, message))
+        # Only errors and warnings need their messages read; messages are grouped by template
+        for log in self.server_group.rows_with_levels(lambda level: level.lower() in ['error', 'warn', 'warning']):
+            message = log.full_message[:100]  # First 100 chars
+            error_messages[log.template_id] += 1
+            if log.timestamp_ns != NO_TIMESTAMP:
+                error_timeline.append((log.parsed_timestamp, log.level.lower(), log.component, message))
         
         # Overall error stats
         total_errors = error_levels['error']
@@ -1593,8 +3448,8 @@ class ServerViewer:
         # Most common error messages
         if error_messages:
             self.analysis_text.insert(tk.END, "Most Common Error/Warning Messages:\n")
-            for msg, count in error_messages.most_common(10):
-                self.analysis_text.insert(tk.END, f"  [{count}x] {msg}...\n")
+            for template_id, count in error_messages.most_common(10):
+                self.analysis_text.insert(tk.END, f"  [{count}x] {LOG_TEMPLATES.template(template_id)[:100]}...\n")
         
         # Recent errors/warnings timeline
         if error_timeline:
@@ -1622,10 +3477,19 @@ class ServerViewer:
         goroutine_counts = []
         event_counts = []
         error_rates = []
+        unavailable = 0
         
         for log in self.server_group.logs:
-            if 'monitoring' in log['raw'] and 'metrics' in log['raw']['monitoring']:
-                metrics = log['raw']['monitoring']['metrics']
+            if not log.has_metrics:
+                continue
+            try:
+                raw = log.raw
+            except (OSError, ValueError):
+                # Raw JSON not kept in memory and its source file moved, deleted or changed
+                unavailable += 1
+                continue
+            if 'monitoring' in raw and 'metrics' in raw['monitoring']:
+                metrics = raw['monitoring']['metrics']
                 
                 # CPU metrics
                 if 'beat' in metrics and 'cpu' in metrics['beat']:
@@ -1660,6 +3524,10 @@ class ServerViewer:
                         event_counts.append(acked)
                         error_rate = max(0, (total - acked) / total * 100)
                         error_rates.append(error_rate)
+                        
+        if unavailable:
+            self.analysis_text.insert(
+                tk.END, f"⚠️  Metrics of {unavailable} logs skipped: source file unavailable\n\n")
         
         # Analyze metrics
         def analyze_metric(values, name, unit=""):
@@ -1738,29 +3606,30 @@ class ServerViewer:
             'status_changes': []
         })
         
-        for log in self.server_group.logs:
-            component = log['component']
-            timestamp = log['parsed_timestamp']
-            level = log['level'].lower()
-            
+        # Counts and activity periods come from the columnar store
+        for (component, level), count in self.server_group.component_level_counts().items():
             stats = component_stats[component]
-            stats['total_logs'] += 1
-            
-            if timestamp != datetime.min:
-                if stats['first_seen'] is None or timestamp < stats['first_seen']:
-                    stats['first_seen'] = timestamp
-                if stats['last_seen'] is None or timestamp > stats['last_seen']:
-                    stats['last_seen'] = timestamp
+            stats['total_logs'] += count
             
+            level = level.lower()
             if level == 'error':
-                stats['error_count'] += 1
+                stats['error_count'] += count
             elif level in ['warn', 'warning']:
-                stats['warning_count'] += 1
+                stats['warning_count'] += count
             elif level == 'info':
-                stats['info_count'] += 1
+                stats['info_count'] += count
+                
+        for component, (first_ns, last_ns, _) in self.server_group.component_time_bounds().items():
+            component_stats[component]['first_seen'] = ns_to_datetime(first_ns)
+            component_stats[component]['last_seen'] = ns_to_datetime(last_ns)
+        
+        for log in self.server_group.logs:
+            component = log.component
+            timestamp = log.timestamp_ns
+            stats = component_stats[component]
             
             # Track status changes
-            message = log['full_message'].lower()
+            message = log.full_message.lower()
             if 'started' in message or 'starting' in message:
                 stats['status_changes'].append(('started', timestamp))
             elif 'stopped' in message or 'stopping' in message:
@@ -1800,8 +3669,8 @@ class ServerViewer:
             if stats['status_changes']:
                 self.analysis_text.insert(tk.END, f"  Status Changes:\n")
                 for status, timestamp in sorted(stats['status_changes'])[-5:]:  # Last 5 changes
-                    if timestamp != datetime.min:
-                        local_time = self.main_app.convert_timezone(timestamp)
+                    if timestamp != NO_TIMESTAMP:
+                        local_time = self.main_app.convert_timezone(ns_to_datetime(timestamp))
                         tz_name = self.main_app.get_timezone_name()
                         self.analysis_text.insert(tk.END, f"    {local_time.strftime('%H:%M:%S')} {tz_name}: {status}\n")
             
@@ -1825,23 +3694,22 @@ class ServerViewer:
         self.analysis_text.insert(tk.END, "-" * 20 + "\n")
         
         # Count key metrics
-        error_count = len([log for log in self.server_group.logs if log['level'].lower() == 'error'])
-        warning_count = len([log for log in self.server_group.logs if log['level'].lower() in ['warn', 'warning']])
+        stats = self.server_group.get_stats()
+        error_count = stats['errors']
+        warning_count = stats['warnings']
         components = len(self.server_group.components)
         
-        # Time range
-        timestamps = [log['parsed_timestamp'] for log in self.server_group.logs if log['parsed_timestamp'] != datetime.min]
+        # Time range from the sorted timestamp column
+        with self.server_group.lock:
+            timestamps = self.server_group.ts_ns[self.server_group.first_timed_row():]
         if timestamps:
-            timestamps.sort()
-            duration = timestamps[-1] - timestamps[0]
+            duration = ns_to_datetime(timestamps[-1]) - ns_to_datetime(timestamps[0])
             self.analysis_text.insert(tk.END, f"Time Range: {duration}\n")
             
             # Look for significant gaps (potential outages)
-            significant_gaps = 0
-            for i in range(1, len(timestamps)):
-                gap = timestamps[i] - timestamps[i-1]
-                if gap > timedelta(minutes=5):
-                    significant_gaps += 1
+            gap_ns = 5 * 60 * 10**9
+            significant_gaps = sum(1 for prev, curr in zip(timestamps, islice(timestamps, 1, None))
+                                   if curr - prev > gap_ns)
             
             self.analysis_text.insert(tk.END, f"Components Active: {components}\n")
             self.analysis_text.insert(tk.END, f"Errors Found: {error_count}\n")
@@ -1903,14 +3771,14 @@ class ServerViewer:
                         for log in self.filtered_logs:
                             export_entry = {
                                 'server_name': self.server_name,  # Use custom name
-                                'file_name': log.get('file_name', 'unknown'),
-                                'line_number': log['line_number'],
-                                'timestamp': log['timestamp'],
-                                'parsed_timestamp': log['parsed_timestamp'].isoformat() if log['parsed_timestamp'] != datetime.min else None,
-                                'level': log['level'],
-                                'component': log['component'],
-                                'message': log['full_message'],
-                                'raw_log': log['raw']
+                                'file_name': log.file_name,
+                                'line_number': log.line_number,
+                                'timestamp': log.timestamp,
+                                'parsed_timestamp': log.parsed_timestamp.isoformat() if log.parsed_timestamp != datetime.min else None,
+                                'level': log.level,
+                                'component': log.component,
+                                'message': log.full_message,
+                                'raw_log': log.raw
                             }
                             export_data.append(export_entry)
                         json.dump(export_data, f, indent=2, default=str)
@@ -1922,9 +3790,9 @@ class ServerViewer:
                         f.write(f"Total Entries: {len(self.filtered_logs)}\n\n")
                         
                         for log in self.filtered_logs:
-                            f.write(f"[{log['timestamp']}] {log['level']} - {log['component']}\n")
-                            f.write(f"File: {log.get('file_name', 'unknown')} (Line {log['line_number']})\n")
-                            f.write(f"Message: {log['full_message']}\n")
+                            f.write(f"[{log.timestamp}] {log.level} - {log.component}\n")
+                            f.write(f"File: {log.file_name} (Line {log.line_number})\n")
+                            f.write(f"Message: {log.full_message}\n")
                             f.write("-" * 80 + "\n")
                             
                 messagebox.showinfo("Success", f"Exported {len(self.filtered_logs)} logs to {file_path}")
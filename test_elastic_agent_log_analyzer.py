@@ -0,0 +1,370 @@
+import json
+import os
+import pickle
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import elastic_agent_log_analyzer as analyzer
+
+
+def write_ndjson(entries):
+    """Write entries to a temporary ndjson file and return its path"""
+    fd, path = tempfile.mkstemp(suffix='.ndjson')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + '\n')
+    return path
+
+
+def load_group(path, group=None):
+    """Parse a file and add its records to a ServerGroup, new unless given"""
+    entries, errors, _, _ = analyzer.parse_file_range(
+        path, 0, os.path.getsize(path), os.path.basename(path), 'Server A')
+    group = group or analyzer.ServerGroup('Server A')
+    group.add_logs(entries)
+    return group
+
+
+class TimestampRangeTest(unittest.TestCase):
+    """Timestamps outside the int64 nanosecond column range"""
+
+    def assert_loads_without_time(self, timestamp):
+        path = write_ndjson([
+            {'@timestamp': timestamp, 'log.level': 'error', 'message': 'zero time'},
+            {'@timestamp': '2024-01-01T00:00:00.000Z', 'log.level': 'info', 'message': 'fine'},
+        ])
+        self.addCleanup(os.remove, path)
+        group = load_group(path)
+        self.assertEqual(len(group.logs), 2)
+        record = next(log for log in group.logs if log.full_message == 'zero time')
+        self.assertEqual(record.timestamp_ns, analyzer.NO_TIMESTAMP)
+        self.assertEqual(record.timestamp, timestamp)
+        self.assertEqual(group.get_stats()['errors'], 1)
+
+    def test_year_0001_loads_without_time(self):
+        self.assert_loads_without_time('0001-01-01T00:00:00Z')
+
+    def test_year_9999_loads_without_time(self):
+        self.assert_loads_without_time('9999-12-31T23:59:59Z')
+
+    def test_datetime_to_ns_range(self):
+        low = datetime(1, 1, 1, tzinfo=timezone.utc)
+        high = datetime(9999, 12, 31, 23, 59, 59, tzinfo=timezone.utc)
+        self.assertEqual(analyzer.datetime_to_ns(low), analyzer.NO_TIMESTAMP)
+        self.assertEqual(analyzer.datetime_to_ns(high), analyzer.NO_TIMESTAMP)
+        self.assertEqual(analyzer.datetime_to_ns(low, clamp=True), analyzer.MIN_TIMESTAMP_NS)
+        self.assertEqual(analyzer.datetime_to_ns(high, clamp=True), analyzer.MAX_TIMESTAMP_NS)
+        self.assertEqual(analyzer.datetime_to_ns(analyzer.EPOCH), 0)
+
+    def test_fast_path_matches_full_parse_at_range_ends(self):
+        for text in ('0001-01-01T00:00:00.123Z', '9999-12-31T23:59:59.999Z',
+                     '1677-09-21T00:12:43.145Z', '1677-09-21T00:12:44.000Z',
+                     '2262-04-11T23:47:16.000Z', '2262-04-11T23:47:16.900Z',
+                     '2024-01-15T10:30:45.123Z'):
+            expected = analyzer.datetime_to_ns(datetime.fromisoformat(text.replace('Z', '+00:00')))
+            self.assertEqual(analyzer.parse_timestamp_ns(text), expected, text)
+        self.assertEqual(analyzer.parse_timestamp_ns('2262-04-11T23:47:16.900Z'), analyzer.NO_TIMESTAMP)
+        self.assertEqual(analyzer.parse_timestamp_ns('0001-01-01T00:00:00.123Z'), analyzer.NO_TIMESTAMP)
+
+
+class AddLogsFailureTest(unittest.TestCase):
+    """A batch that add_logs rejects must not change the group"""
+
+    def test_failed_batch_leaves_no_trace(self):
+        bad = write_ndjson([{'@timestamp': '2024-01-01T00:00:00.000Z', 'log.level': ['error'],
+                             'message': 'zero'}])
+        good = write_ndjson([{'@timestamp': '2024-01-01T00:00:01.000Z', 'log.level': 'info',
+                              'message': 'fine'}])
+        self.addCleanup(os.remove, bad)
+        self.addCleanup(os.remove, good)
+        group = analyzer.ServerGroup('Server A')
+        with self.assertRaises(TypeError):
+            load_group(bad, group)
+        self.assertEqual(group.version, 0)
+        self.assertEqual(group.get_stats()['total_logs'], 0)
+        self.assertEqual(group.get_stats()['errors'], 0)
+        self.assertEqual(group.file_table.values, [])
+
+        load_group(good, group)
+        self.assertEqual(len(group.logs), 1)
+        # Until indexed, every new log is a candidate
+        self.assertEqual(group.search_rows('zero'), ([0], False))
+        group.index_new_logs()
+        self.assertEqual(group.search_rows('zero')[0], [])
+        self.assertEqual(group.search_rows('fine'), ([0], True))
+
+
+
+class ParseQueryTest(unittest.TestCase):
+    """Query bar parsing"""
+
+    def test_repeated_field_is_rejected(self):
+        with self.assertRaises(ValueError):
+            analyzer.parse_query('level:error level:warn')
+        self.assertEqual(analyzer.parse_query('level:error level:ERROR')['level'], 'ERROR')
+
+    def test_times_without_offset_use_display_timezone(self):
+        utc = analyzer.parse_query('@timestamp>=2024-01-15T10:00')['start_ns']
+        eastern = analyzer.parse_query('@timestamp>=2024-01-15T10:00', timedelta(hours=-5))['start_ns']
+        self.assertEqual(eastern - utc, 5 * 3600 * 10**9)
+        explicit = analyzer.parse_query('@timestamp>=2024-01-15T10:00Z', timedelta(hours=-5))['start_ns']
+        self.assertEqual(explicit, utc)
+
+    def test_filter_time_uses_display_timezone(self):
+        eastern = timezone(timedelta(hours=-5))
+        self.assertEqual(analyzer.parse_filter_time('2024-01-15 10:00:00', timedelta(hours=-5)),
+                         datetime(2024, 1, 15, 10, tzinfo=eastern))
+        self.assertEqual(analyzer.parse_filter_time('2024-01-15T10:00Z', timedelta(hours=-5)),
+                         datetime(2024, 1, 15, 10, tzinfo=timezone.utc))
+        self.assertIsNone(analyzer.parse_filter_time('yesterday'))
+
+
+
+class TemplateMinerTest(unittest.TestCase):
+    """Message template mining"""
+
+    def test_clear_forgets_templates(self):
+        miner = analyzer.TemplateMiner()
+        logs = [SimpleNamespace(full_message=message)
+                for message in ('disk 1 full', 'disk 2 full', 'agent started')]
+        miner.assign(logs)
+        self.assertEqual(len(miner), 2)
+        miner.clear()
+        self.assertEqual(len(miner), 0)
+        miner.assign(logs[2:])
+        self.assertEqual(logs[2].template_id, 0)
+        self.assertEqual(miner.template(0), 'agent started')
+
+
+
+class ParseColumnsTest(unittest.TestCase):
+    """Records sent back from parse worker processes as columns"""
+
+    def test_columns_rebuild_the_same_records(self):
+        path = write_ndjson([
+            {'@timestamp': '2024-01-01T00:00:00.000Z', 'log.level': 'info', 'message': 'a',
+             'component': {'binary': 'filebeat'}},
+            {'@timestamp': 'not a time', 'log.level': 'error', 'message': 'b', 'monitoring': {}},
+            {'message': 'c', 'service.name': 'endpoint'},
+        ])
+        self.addCleanup(os.remove, path)
+        size = os.path.getsize(path)
+        expected = analyzer.parse_file_range(path, 0, size, 'f', 'S')
+        columns, errors, line_count, leading_blank = pickle.loads(pickle.dumps(
+            analyzer.parse_file_columns(path, 0, size, 'f', 'S')))
+        records = analyzer.records_from_columns(columns, path, 'f', 'S')
+        self.assertEqual((errors, line_count, leading_blank), expected[1:])
+        fields = ('line_number', 'file_name', 'server_name', 'timestamp_ns', 'timestamp_text',
+                  'level', 'component', 'full_message', 'has_metrics', 'raw')
+        for record, original in zip(records, expected[0]):
+            for field in fields:
+                self.assertEqual(getattr(record, field), getattr(original, field), field)
+        self.assertEqual(len(records), len(expected[0]))
+        analyzer.RAW_ENTRIES.clear()
+
+
+
+class DecodeJsonTest(unittest.TestCase):
+    """decode_json must give the same values and errors as json.loads"""
+
+    def test_matches_stdlib(self):
+        for text in ('{"a": 123456789012345678901234567890}', '{"a": -9223372036854775809}',
+                     '{"a": 18446744073709551615, "b": "x"}', '{"a": NaN}', '{"a": 1e400}',
+                     '{"id": "1234567890123456789012"}', '{"a": 0.1, "b": [1, 2.5e-3]}'):
+            decoded = analyzer.decode_json(text)
+            expected = json.loads(text)
+            self.assertEqual(repr(decoded), repr(expected), text)
+
+    def test_malformed_raises_json_error(self):
+        with self.assertRaises(json.JSONDecodeError):
+            analyzer.decode_json('{"a": ')
+
+
+
+class AddLogsMergeTest(unittest.TestCase):
+    """Appending, prepending and merging batches into the time-ordered columns"""
+
+    def parse_logs(self, seconds, label):
+        path = write_ndjson([{'@timestamp': f'2024-01-01T00:00:{second:02d}.000Z',
+                              'log.level': 'error' if second % 2 else 'info',
+                              'message': f'{label} {second}'} for second in seconds])
+        self.addCleanup(os.remove, path)
+        return analyzer.parse_file_range(path, 0, os.path.getsize(path), label, 'Server A')[0]
+
+    def test_batches_stay_ordered_and_aligned(self):
+        group = analyzer.ServerGroup('Server A')
+        group.add_logs(self.parse_logs([20, 21, 22], 'first'))
+        group.add_logs(self.parse_logs([30, 31], 'append'))
+        group.add_logs(self.parse_logs([5, 1], 'prepend'))
+        group.add_logs(self.parse_logs([21, 10, 40], 'merge'))
+
+        # On equal timestamps the log loaded first stays first
+        self.assertEqual([log.full_message for log in group.logs],
+                         ['prepend 1', 'prepend 5', 'merge 10', 'first 20', 'first 21', 'merge 21',
+                          'first 22', 'append 30', 'append 31', 'merge 40'])
+        self.assertEqual(list(group.ts_ns), [log.timestamp_ns for log in group.logs])
+        self.assertEqual(sorted(group.rids), list(range(len(group.logs))))
+        for row, log in enumerate(group.logs):
+            self.assertEqual(group.rows_by_rid[group.rids[row]], row)
+            self.assertEqual(group.level_table.values[group.level_codes[row]], log.level)
+            self.assertEqual(group.file_table.values[group.file_codes[row]], log.file_name)
+        self.assertEqual(group.get_stats()['errors'], 5)
+
+        # Record ids from every batch lead back to their rows
+        group.index_new_logs()
+        rows, exact = group.search_rows('merge')
+        self.assertTrue(exact)
+        self.assertEqual([group.logs[row].full_message for row in rows], ['merge 10', 'merge 21', 'merge 40'])
+        self.assertEqual(group.select_rows(level='error', file_name='first'), [4])
+
+
+
+
+class TokenIndexTest(unittest.TestCase):
+    """Token index candidates compared with a plain substring search"""
+
+    TEXTS = [
+        'connection to backoff(elasticsearch(https://es-1.example.com:9200)) established',
+        'failed to connect to backoff(elasticsearch(https://es-12.example.com:9200)): connection refused',
+        'harvester started for paths: [/var/log/app-1.log]',
+        'error while reading from source: timeout after 500ms',
+        'non-zero metrics in the last 30s',
+        'unit filestream-default changed state from starting to healthy',
+    ]
+    TERMS = ['connection', 'connect', 'onnect', 'es-1', 'es-1.', 'es-12.example', ':9200', '9200)',
+             'to backoff', 'ed to', 'app-1.log', '/var/log/', 'timeout after 500', 'after 50',
+             'non-zero', 'zero metrics', 'filestream-default changed', 'lt ch', 'x', 'ab',
+             'missing', 'harvester started for paths']
+
+    def test_candidates_cover_matches_and_exact_is_exact(self):
+        index = analyzer.TokenIndex()
+        index.add_postings(analyzer.build_token_postings(self.TEXTS))
+        for term in self.TERMS:
+            expected = {i for i, text in enumerate(self.TEXTS) if term in text}
+            ids, exact = index.candidates(term)
+            self.assertLessEqual(expected, set(ids), term)
+            if exact:
+                self.assertEqual(set(ids), expected, term)
+        # Only single tokens are exact; terms spanning separators need the record check
+        self.assertTrue(index.candidates('connection')[1])
+        self.assertFalse(index.candidates('es-12.example')[1])
+        self.assertEqual(index.candidates(':: ()'), (None, False))
+
+    def test_postings_added_in_batches(self):
+        index = analyzer.TokenIndex()
+        index.add_postings(analyzer.build_token_postings(self.TEXTS[:3]))
+        index.add_postings(analyzer.build_token_postings(self.TEXTS[3:], 3))
+        for term in self.TERMS:
+            expected = {i for i, text in enumerate(self.TEXTS) if term in text}
+            ids, exact = index.candidates(term)
+            self.assertLessEqual(expected, set(ids), term)
+            if exact:
+                self.assertEqual(set(ids), expected, term)
+
+
+
+
+class FilterRefinementTest(unittest.TestCase):
+    """Reusing a cached filter result for a narrower filter"""
+
+    @staticmethod
+    def spec(start_ns=None, end_ns=None, level=None, search=(), pattern=None, message=()):
+        return (start_ns, end_ns, None, level, None, search, pattern, message)
+
+    def test_filter_narrows(self):
+        spec = self.spec
+        self.assertTrue(analyzer.filter_narrows(spec(search=('refused', 'conn')), spec(search=('conn',))))
+        self.assertTrue(analyzer.filter_narrows(spec(search=('connection',)), spec(search=('conn',))))
+        self.assertFalse(analyzer.filter_narrows(spec(search=('con',)), spec(search=('conn',))))
+        self.assertTrue(analyzer.filter_narrows(spec(message=('failed',)), spec(search=('fail',))))
+        self.assertFalse(analyzer.filter_narrows(spec(search=('failed',)), spec(message=('fail',))))
+        self.assertTrue(analyzer.filter_narrows(spec(10, 20, level='error'), spec(5, 30)))
+        self.assertFalse(analyzer.filter_narrows(spec(10, None), spec(5, 30)))
+        self.assertFalse(analyzer.filter_narrows(spec(), spec(level='error')))
+        self.assertFalse(analyzer.filter_narrows(spec(pattern='b.d'), spec(pattern='a.c')))
+        self.assertTrue(analyzer.filter_narrows(spec(search=('x',), pattern='a.c'), spec(pattern='a.c')))
+
+    @staticmethod
+    def make_viewer(group):
+        """Return the viewer state _run_filter uses"""
+        return SimpleNamespace(server_group=group, filter_generation=0, _on_filter_chunk=None,
+                               filter_cache=analyzer.LRUCache(analyzer.FILTER_CACHE_SIZE))
+
+    def run_filter(self, viewer, spec):
+        """Run a viewer's filter on this thread and return the logs it shows"""
+        chunks = []
+        viewer.filter_generation += 1
+        viewer.main_app = SimpleNamespace(root=SimpleNamespace(
+            after=lambda delay, callback, *args: chunks.append(args)))
+        analyzer.ServerViewer._run_filter(viewer, viewer.filter_generation, spec, None)
+        return [log.full_message for _, logs, _, _ in chunks for log in logs]
+
+    def test_refined_results_match_a_fresh_filter(self):
+        messages = ['connection refused by es-1', 'connection established to es-1',
+                    'connection refused by es-2', 'harvester started', 'Connection Refused again']
+        path = write_ndjson([{'@timestamp': f'2024-01-01T00:00:{i:02d}.000Z', 'log.level': 'info',
+                              'message': message} for i, message in enumerate(messages)])
+        self.addCleanup(os.remove, path)
+        group = load_group(path)
+        viewer = self.make_viewer(group)
+
+        specs = [self.spec(search=('conn',)), self.spec(search=('refused', 'conn')),
+                 self.spec(search=('refused', 'conn'), message=('es-',)),
+                 self.spec(search=('connection refused', 'conn'))]
+        for spec in specs:
+            expected = [message for message in messages
+                        if all(term in message.lower() for term in spec[5] + spec[7])]
+            self.assertEqual(self.run_filter(viewer, spec), expected, spec)
+            self.assertEqual(self.run_filter(self.make_viewer(group), spec), expected, spec)
+
+        # Results cached before a load are not reused after it
+        more = write_ndjson([{'@timestamp': '2024-01-01T00:01:00.000Z', 'log.level': 'info',
+                              'message': 'connection refused late'}])
+        self.addCleanup(os.remove, more)
+        load_group(more, group)
+        self.assertEqual(self.run_filter(viewer, specs[1]),
+                         ['connection refused by es-1', 'connection refused by es-2',
+                          'Connection Refused again', 'connection refused late'])
+
+
+
+
+class SplitRangesTest(unittest.TestCase):
+    """Line numbers of a file parsed in several byte ranges"""
+
+    def test_ranges_number_lines_like_one_range(self):
+        lines = ['', '', json.dumps({'message': 'first'}), 'not json', '',
+                 *(json.dumps({'message': f'entry {i}', 'log.level': 'info'}) for i in range(40)),
+                 '{"message": ', '', '', json.dumps({'message': 'last'}), '']
+        fd, path = tempfile.mkstemp(suffix='.ndjson')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines))
+        self.addCleanup(os.remove, path)
+
+        def parse(ranges):
+            results = [analyzer.parse_file_range(path, start, end, 'f', 'S') for start, end in ranges]
+            renumbered = list(analyzer.renumber_range_results(results))
+            return ([(entry.line_number, entry.full_message) for entries, _ in renumbered for entry in entries],
+                    [error for _, errors in renumbered for error in errors])
+
+        size = os.path.getsize(path)
+        expected = parse([(0, size)])
+        # Leading blank lines are not counted
+        self.assertEqual(expected[0][0], (1, 'first'))
+        self.assertEqual(expected[0][-1], (47, 'last'))
+        self.assertEqual([line_num for line_num, _ in expected[1]], [2, 44])
+        for parts in range(2, 8):
+            ranges = analyzer.split_file_ranges(path, parts)
+            self.assertEqual(ranges[0][0], 0)
+            self.assertEqual(ranges[-1][1], size)
+            self.assertTrue(all(end == start for (_, end), (start, _) in zip(ranges, ranges[1:])))
+            self.assertGreater(len(ranges), 1)
+            self.assertEqual(parse(ranges), expected, parts)
+        analyzer.RAW_ENTRIES.clear()
+
+
+
+if __name__ == '__main__':
+    unittest.main()